@@ -1,8 +1,5 @@
 //! Library-wide error types and [`From`] impls
 
-use std::collections::HashMap;
-use std::sync::LazyLock;
-
 use axum::extract::multipart::MultipartError;
 use axum::http::StatusCode;
 use axum::response::{IntoResponse, Response};
@@ -460,6 +457,13 @@ impl From<argon2::password_hash::Error> for Error {
 	}
 }
 
+/// Map async task errors to application errors
+impl From<tokio::task::JoinError> for Error {
+	fn from(err: tokio::task::JoinError) -> Self {
+		InternalServerError::JoinError(err).into()
+	}
+}
+
 /// Map database interaction errors to application errors
 impl From<deadpool_diesel::InteractError> for Error {
 	fn from(value: deadpool_diesel::InteractError) -> Self {
@@ -467,15 +471,14 @@ impl From<deadpool_diesel::InteractError> for Error {
 	}
 }
 
-/// Map of constraint names to column names.
-static CONSTRAINT_TO_COLUMN: LazyLock<HashMap<&str, &str>> =
-	LazyLock::new(|| {
-		HashMap::from([
-			("profile_username_key", "username"),
-			("profile_email_key", "email"),
-			("profile_pending_email_key", "email"),
-		])
-	});
+/// Map a constraint name to the column it guards.
+fn constraint_to_column(constraint: &str) -> Option<&'static str> {
+	match constraint {
+		"profile_username_key" => Some("username"),
+		"profile_email_key" | "profile_pending_email_key" => Some("email"),
+		_ => None,
+	}
+}
 
 /// Map database result errors to application errors.
 impl From<diesel::result::Error> for Error {
@@ -492,7 +495,7 @@ impl From<diesel::result::Error> for Error {
 			) => {
 				let constraint_name = info.constraint_name().unwrap();
 
-				match CONSTRAINT_TO_COLUMN.get(constraint_name) {
+				match constraint_to_column(constraint_name) {
 					Some(field) => {
 						Self::Duplicate(format!("{field} is already in use"))
 					},
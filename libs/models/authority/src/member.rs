@@ -97,12 +97,22 @@ impl NewAuthorityMember {
 	/// Insert this [`NewAuthorityMember`]
 	#[instrument(skip(conn))]
 	pub async fn insert(self, conn: &DbConn) -> Result<Profile, Error> {
-		conn.interact(move |conn| {
-			use self::authority_member::dsl::*;
+		let inserted = conn
+			.interact(move |conn| {
+				use self::authority_member::dsl::*;
 
-			diesel::insert_into(authority_member).values(self).execute(conn)
-		})
-		.await??;
+				diesel::insert_into(authority_member)
+					.values(self)
+					.on_conflict_do_nothing()
+					.execute(conn)
+			})
+			.await??;
+
+		if inserted == 0 {
+			return Err(Error::Duplicate(
+				"profile is already a member of this authority".to_string(),
+			));
+		}
 
 		let profile = conn
 			.interact(move |conn| {
@@ -24,7 +24,7 @@ pub struct PaginationConfig {
 }
 
 #[inline]
-pub fn manual_pagination<T: Clone>(
+pub fn manual_pagination<T>(
 	items: Vec<T>,
 	cfg: PaginationConfig,
 ) -> Result<PaginatedData<Vec<T>>, Error> {
@@ -43,13 +43,7 @@ pub fn manual_pagination<T: Clone>(
 	#[allow(clippy::cast_possible_truncation)]
 	let truncated = total == (QUERY_HARD_LIMIT as usize);
 
-	let limit = if cfg.limit > items[cfg.offset..].len() {
-		items[cfg.offset..].len()
-	} else {
-		cfg.limit
-	};
-
-	let items = items[cfg.offset..cfg.offset + limit].to_vec();
+	let items = items.into_iter().skip(cfg.offset).take(cfg.limit).collect();
 
 	let data = (total, truncated, items);
 
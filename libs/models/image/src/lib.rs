@@ -3,7 +3,7 @@ extern crate tracing;
 
 use chrono::NaiveDateTime;
 use common::{DbConn, Error};
-use db::{image, location, location_image, profile};
+use db::{image, location_image, profile};
 use diesel::pg::Pg;
 use diesel::prelude::*;
 use diesel::sql_types::Bool;
@@ -124,14 +124,12 @@ impl Image {
 		let imgs = conn
 			.interact(move |conn| {
 				use self::image::dsl::*;
-				use self::location;
 				use self::location_image::dsl::*;
 
-				location::table
-					.filter(location::id.eq_any(l_ids))
-					.inner_join(location_image.on(location_id.eq(location::id)))
+				location_image
+					.filter(location_id.eq_any(l_ids))
 					.inner_join(query.on(image_id.eq(id)))
-					.select((location::id, Self::as_select(), index))
+					.select((location_id, Self::as_select(), index))
 					.get_results(conn)
 			})
 			.await??
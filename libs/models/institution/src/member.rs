@@ -101,12 +101,22 @@ impl NewInstitutionMember {
 		conn: &DbConn,
 	) -> Result<Profile, Error>
 	{
-		conn.interact(move |conn| {
-			use self::institution_member::dsl::*;
+		let inserted = conn
+			.interact(move |conn| {
+				use self::institution_member::dsl::*;
 
-			diesel::insert_into(institution_member).values(self).execute(conn)
-		})
-		.await??;
+				diesel::insert_into(institution_member)
+					.values(self)
+					.on_conflict_do_nothing()
+					.execute(conn)
+			})
+			.await??;
+
+		if inserted == 0 {
+			return Err(Error::Duplicate(
+				"profile is already a member of this institution".to_string(),
+			));
+		}
 
 		let profile = conn
 			.interact(move |conn| {
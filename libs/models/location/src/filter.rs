@@ -15,7 +15,8 @@ use diesel::dsl::sql;
 use diesel::pg::Pg;
 use diesel::prelude::*;
 use diesel::sql_types::{Bool, Nullable, Text};
-use serde::{Deserialize, Serialize};
+use serde::de::Error as _;
+use serde::{Deserialize, Deserializer, Serialize};
 use serde_with::DisplayFromStr;
 
 use crate::{Location, LocationIncludes};
@@ -43,10 +44,56 @@ pub struct LocationFilter {
 #[derive(Clone, Debug, Deserialize, Serialize)]
 #[serde(rename_all = "camelCase")]
 pub struct QueryFilter {
-	pub language: String,
+	pub language: Language,
 	pub query:    String,
 }
 
+/// Languages a [`QueryFilter`] can search in
+#[derive(Clone, Copy, Debug, Serialize)]
+#[serde(rename_all = "lowercase")]
+pub enum Language {
+	Nl,
+	En,
+	Fr,
+	De,
+}
+
+impl Language {
+	/// Name of the translation column holding this language
+	#[must_use]
+	pub fn column_name(self) -> &'static str {
+		match self {
+			Self::Nl => "nl",
+			Self::En => "en",
+			Self::Fr => "fr",
+			Self::De => "de",
+		}
+	}
+}
+
+impl<'de> Deserialize<'de> for Language {
+	/// Parse a language code regardless of case (`nl`, `NL`, `Nl`, ...)
+	fn deserialize<D>(deserializer: D) -> Result<Self, D::Error>
+	where
+		D: Deserializer<'de>,
+	{
+		let language = String::deserialize(deserializer)?;
+
+		match language.to_ascii_lowercase().as_str() {
+			"nl" => Ok(Self::Nl),
+			"en" => Ok(Self::En),
+			"fr" => Ok(Self::Fr),
+			"de" => Ok(Self::De),
+			_ => {
+				Err(D::Error::unknown_variant(
+					&language,
+					&["nl", "en", "fr", "de"],
+				))
+			},
+		}
+	}
+}
+
 #[derive(Clone, Copy, Debug, Deserialize, Serialize)]
 #[serde(rename_all = "camelCase")]
 pub struct ReservableFilter {
@@ -101,7 +148,7 @@ impl<S> ToFilter<S> for QueryFilter {
 	type SqlType = Bool;
 
 	fn to_filter(&self) -> BoxedCondition<S, Self::SqlType> {
-		let language = self.language.clone().to_ascii_lowercase();
+		let language = self.language.column_name();
 
 		let dyn_description = diesel_dynamic_schema::table("description");
 		let dyn_excerpt = diesel_dynamic_schema::table("excerpt");
@@ -112,7 +159,7 @@ impl<S> ToFilter<S> for QueryFilter {
 			.bind::<Text, _>(self.query.clone());
 
 		let desc_filter = sql::<Bool>("")
-			.bind::<Text, _>(dyn_description.column(language.clone()))
+			.bind::<Text, _>(dyn_description.column(language))
 			.sql(" % ")
 			.bind::<Text, _>(self.query.clone());
 
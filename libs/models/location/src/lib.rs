@@ -3,6 +3,7 @@ extern crate serde_with;
 #[macro_use]
 extern crate tracing;
 
+use std::collections::HashMap;
 use std::hash::Hash;
 
 use ::image::{Image, OrderedImage};
@@ -27,7 +28,6 @@ use db::{
 	location,
 	location_member,
 	location_role,
-	opening_time,
 	profile,
 	rejecter,
 	translation,
@@ -45,7 +45,6 @@ use primitives::{
 	PrimitiveProfile,
 	PrimitiveTranslation,
 };
-use rayon::prelude::*;
 use serde::{Deserialize, Serialize};
 use serde_with::DisplayFromStr;
 use tag::TagIncludes;
@@ -162,6 +161,17 @@ fn updated_by_fragment() -> updated_by_fragment {
 	updater.fields(profile::all_columns).nullable()
 }
 
+/// Bucket related records by the id of the location they belong to
+fn bucket_by_location<T>(records: Vec<(i32, T)>) -> HashMap<i32, Vec<T>> {
+	let mut buckets: HashMap<i32, Vec<T>> = HashMap::new();
+
+	for (l_id, record) in records {
+		buckets.entry(l_id).or_default().push(record);
+	}
+
+	buckets
+}
+
 impl Hash for Location {
 	fn hash<H: std::hash::Hasher>(&self, state: &mut H) {
 		self.primitive.id.hash(state);
@@ -237,32 +247,27 @@ impl Location {
 	}
 
 	/// Group a locations and their related data together
+	///
+	/// The related records are bucketed by location once, so every location
+	/// takes its own records instead of scanning all of them
 	#[must_use]
 	pub fn group(
 		locs: Vec<Location>,
-		times: &[(i32, OpeningTime)],
-		tags: &[(i32, Tag)],
-		imgs: &[(i32, OrderedImage)],
+		times: Vec<(i32, OpeningTime)>,
+		tags: Vec<(i32, Tag)>,
+		imgs: Vec<(i32, OrderedImage)>,
 	) -> Vec<FullLocationData> {
-		locs.into_par_iter()
+		let mut times = bucket_by_location(times);
+		let mut tags = bucket_by_location(tags);
+		let mut imgs = bucket_by_location(imgs);
+
+		locs.into_iter()
 			.map(|l| {
 				let l_id = l.primitive.id;
 
-				let times = times
-					.iter()
-					.filter(|(i, _)| *i == l_id)
-					.map(|(_, d)| d.to_owned())
-					.collect();
-				let tags = tags
-					.iter()
-					.filter(|(i, _)| *i == l_id)
-					.map(|(_, d)| d.to_owned())
-					.collect();
-				let imgs = imgs
-					.iter()
-					.filter(|(i, _)| *i == l_id)
-					.map(|(_, d)| d.to_owned())
-					.collect();
+				let times = times.remove(&l_id).unwrap_or_default();
+				let tags = tags.remove(&l_id).unwrap_or_default();
+				let imgs = imgs.remove(&l_id).unwrap_or_default();
 
 				(l, (times, tags, imgs))
 			})
@@ -369,7 +374,7 @@ impl Location {
 		let tags = tags?;
 		let imgs = imgs?;
 
-		Ok(Self::group(locations, &times, &tags, &imgs))
+		Ok(Self::group(locations, times, tags, imgs))
 	}
 
 	/// Get all locations created by a given profile
@@ -409,7 +414,7 @@ impl Location {
 		let tags = tags?;
 		let imgs = imgs?;
 
-		Ok(Self::group(locations, &times, &tags, &imgs))
+		Ok(Self::group(locations, times, tags, imgs))
 	}
 
 	/// Get the location nearest to the given point
@@ -478,7 +483,6 @@ impl Location {
 
 				query
 					.filter(authority_id.eq(auth_id))
-					.left_outer_join(opening_time::table)
 					.select(Self::as_select())
 					.load(conn)
 			})
@@ -501,16 +505,33 @@ impl Location {
 		let tags = tags?;
 		let imgs = imgs?;
 
-		Ok(Self::group(locations, &times, &tags, &imgs))
+		Ok(Self::group(locations, times, tags, imgs))
 	}
 
 	/// Delete a [`Location`] by its id
+	///
+	/// The description and excerpt translations are owned by the location and
+	/// are removed along with it
 	#[instrument(skip(conn))]
 	pub async fn delete_by_id(loc_id: i32, conn: &DbConn) -> Result<(), Error> {
 		conn.interact(move |conn| {
-			use self::location::dsl::*;
-
-			diesel::delete(location.filter(id.eq(loc_id))).execute(conn)
+			conn.transaction::<_, Error, _>(|conn| {
+				let (desc_id, exc_id) =
+					diesel::delete(location::table.find(loc_id))
+						.returning((
+							location::description_id,
+							location::excerpt_id,
+						))
+						.get_result::<(i32, i32)>(conn)?;
+
+				diesel::delete(
+					translation::table
+						.filter(translation::id.eq_any(vec![desc_id, exc_id])),
+				)
+				.execute(conn)?;
+
+				Ok(())
+			})
 		})
 		.await??;
 
@@ -626,21 +647,21 @@ impl NewLocation {
 					use self::location::dsl::location;
 					use self::translation::dsl::translation;
 
-					let desc = diesel::insert_into(translation)
+					let desc_id = diesel::insert_into(translation)
 						.values(self.description)
-						.returning(PrimitiveTranslation::as_returning())
+						.returning(self::translation::id)
 						.get_result(conn)?;
 
-					let exc = diesel::insert_into(translation)
+					let exc_id = diesel::insert_into(translation)
 						.values(self.excerpt)
-						.returning(PrimitiveTranslation::as_returning())
+						.returning(self::translation::id)
 						.get_result(conn)?;
 
 					let new_location = InsertableNewLocation {
 						name:                   self.name,
 						authority_id:           self.authority_id,
-						description_id:         desc.id,
-						excerpt_id:             exc.id,
+						description_id:         desc_id,
+						excerpt_id:             exc_id,
 						seat_count:             self.seat_count,
 						is_reservable:          self.is_reservable,
 						max_reservation_length: self.max_reservation_length,
@@ -72,12 +72,22 @@ impl NewLocationMember {
 	/// Insert this [`NewLocationMember`]
 	#[instrument(skip(conn))]
 	pub async fn insert(self, conn: &DbConn) -> Result<Profile, Error> {
-		conn.interact(move |conn| {
-			use self::location_member::dsl::*;
+		let inserted = conn
+			.interact(move |conn| {
+				use self::location_member::dsl::*;
 
-			diesel::insert_into(location_member).values(self).execute(conn)
-		})
-		.await??;
+				diesel::insert_into(location_member)
+					.values(self)
+					.on_conflict_do_nothing()
+					.execute(conn)
+			})
+			.await??;
+
+		if inserted == 0 {
+			return Err(Error::Duplicate(
+				"profile is already a member of this location".to_string(),
+			));
+		}
 
 		let profile = Profile::get(self.profile_id, conn).await?;
 
@@ -1,10 +1,20 @@
 #[macro_use]
 extern crate tracing;
 
+use std::sync::LazyLock;
+
 use ::image::NewImage;
 use argon2::password_hash::SaltString;
 use argon2::password_hash::rand_core::OsRng;
-use argon2::{Argon2, PasswordHasher};
+use argon2::{
+	Algorithm,
+	Argon2,
+	Params,
+	PasswordHash,
+	PasswordHasher,
+	PasswordVerifier,
+	Version,
+};
 use base::{
 	PaginatedData,
 	PaginationConfig,
@@ -22,6 +32,7 @@ use db::{
 	profile,
 	reservation,
 };
+use diesel::connection::DefaultLoadingMode;
 use diesel::pg::Pg;
 use diesel::prelude::*;
 use lettre::message::Mailbox;
@@ -29,6 +40,60 @@ use primitives::{PrimitiveImage, PrimitiveProfile};
 use rand::Rng;
 use rand::distr::Alphabetic;
 use serde::{Deserialize, Serialize};
+use tokio::sync::Semaphore;
+
+/// The hasher used for passwords, this is built once and shared by all hashing
+/// and verification
+///
+/// This uses Argon2id with the OWASP recommended parameters, 19 MiB of memory,
+/// 2 iterations and a parallelism of 1. These can be changed through
+/// `PASSWORD_HASH_MEMORY_KIB`, `PASSWORD_HASH_ITERATIONS` and
+/// `PASSWORD_HASH_PARALLELISM`, only debug builds (which the tests run as) can
+/// lower them
+static PASSWORD_HASHER: LazyLock<Argon2<'static>> = LazyLock::new(|| {
+	let params = Params::new(
+		hash_param_from_env("PASSWORD_HASH_MEMORY_KIB", 19 * 1024),
+		hash_param_from_env("PASSWORD_HASH_ITERATIONS", 2),
+		hash_param_from_env("PASSWORD_HASH_PARALLELISM", 1),
+		None,
+	)
+	.expect("INVALID PASSWORD HASHING PARAMETERS");
+
+	Argon2::new(Algorithm::Argon2id, Version::V0x13, params)
+});
+
+/// Read a password hashing parameter from the environment, defaulting to the
+/// recommended `minimum`
+///
+/// Release builds raise values below the minimum to it, so a leftover test
+/// setting can't weaken the hashes of a real deployment
+///
+/// # Panics
+/// Panics if the variable is set but is not a number
+fn hash_param_from_env(var: &str, minimum: u32) -> u32 {
+	let value = std::env::var(var).map_or(minimum, |v| {
+		v.parse().unwrap_or_else(|_| panic!("{var} must be a number"))
+	});
+
+	if value < minimum && !cfg!(debug_assertions) {
+		warn!("{var} is below the minimum of {minimum}, using the minimum");
+
+		return minimum;
+	}
+
+	value
+}
+
+/// Limits the number of passwords being hashed or verified at the same time
+///
+/// Every operation takes the memory and time configured for
+/// [`PASSWORD_HASHER`] on a full core, so a burst of logins is queued here
+/// instead of piling up on the blocking thread pool
+static PASSWORD_PERMITS: LazyLock<Semaphore> = LazyLock::new(|| {
+	let permits = std::thread::available_parallelism().map_or(1, Into::into);
+
+	Semaphore::new(permits)
+});
 
 #[derive(Clone, Debug, Deserialize, Serialize)]
 #[serde(rename_all = "camelCase")]
@@ -80,6 +145,10 @@ pub struct Profile {
 impl Profile {
 	/// Build a query with all required (dynamic) joins to select a full
 	/// profile data tuple
+	///
+	/// Queries built on top of this are fully typed and never boxed, diesel
+	/// prepares them once per connection and reuses the cached statement for
+	/// every later lookup (e.g. by username on each login)
 	#[diesel::dsl::auto_type(no_type_alias)]
 	fn query() -> _ {
 		profile::table.left_join(
@@ -164,6 +233,8 @@ impl Profile {
 	}
 
 	/// Get a [`Profile`] given its username
+	///
+	/// Usernames are unique so this is a single lookup in their unique index
 	#[instrument(skip(conn))]
 	pub async fn get_by_username(
 		query_username: String,
@@ -178,7 +249,7 @@ impl Profile {
 				query
 					.filter(username.eq(query_username))
 					.select(Self::as_select())
-					.first(conn)
+					.get_result(conn)
 			})
 			.await??;
 
@@ -222,7 +293,7 @@ impl Profile {
 				query
 					.filter(email_confirmation_token.eq(token))
 					.select(Self::as_select())
-					.first(conn)
+					.get_result(conn)
 			})
 			.await??;
 
@@ -244,7 +315,7 @@ impl Profile {
 				query
 					.filter(password_reset_token.eq(token))
 					.select(Self::as_select())
-					.first(conn)
+					.get_result(conn)
 			})
 			.await??;
 
@@ -315,13 +386,92 @@ impl Profile {
 	}
 
 	/// Hash a password using Argon2
-	pub fn hash_password(password: &str) -> Result<String, Error> {
-		let salt = SaltString::generate(&mut OsRng);
-		let hashed_password = Argon2::default()
-			.hash_password(password.as_bytes(), &salt)?
-			.to_string();
+	///
+	/// Hashing is deliberately expensive so it is run on the blocking thread
+	/// pool instead of stalling the async runtime
+	pub async fn hash_password(password: &str) -> Result<String, Error> {
+		let password = password.to_string();
+
+		let _permit =
+			PASSWORD_PERMITS.acquire().await.expect("PASSWORD PERMITS CLOSED");
+
+		tokio::task::spawn_blocking(move || {
+			let salt = SaltString::generate(&mut OsRng);
+			let hashed_password = PASSWORD_HASHER
+				.hash_password(password.as_bytes(), &salt)?
+				.to_string();
+
+			Ok::<_, Error>(hashed_password)
+		})
+		.await?
+	}
+
+	/// Verify a password against the password hash of this [`Profile`]
+	///
+	/// Like hashing this is run on the blocking thread pool
+	pub async fn verify_password(&self, password: &str) -> Result<(), Error> {
+		let password_hash = self.primitive.password_hash.clone();
+		let password = password.to_string();
+
+		let _permit =
+			PASSWORD_PERMITS.acquire().await.expect("PASSWORD PERMITS CLOSED");
+
+		tokio::task::spawn_blocking(move || {
+			let password_hash = PasswordHash::new(&password_hash)?;
+
+			PASSWORD_HASHER
+				.verify_password(password.as_bytes(), &password_hash)?;
+
+			Ok::<_, Error>(())
+		})
+		.await?
+	}
+
+	/// Check if the password hash of this [`Profile`] was created with weaker
+	/// hashing parameters than the current ones
+	///
+	/// Hashes with stronger parameters are left alone, so lowering the
+	/// parameters never downgrades stored hashes
+	pub fn password_needs_rehash(&self) -> Result<bool, Error> {
+		let password_hash = PasswordHash::new(&self.primitive.password_hash)?;
+
+		if password_hash.algorithm != Algorithm::Argon2id.ident() {
+			return Ok(true);
+		}
+
+		let current = PASSWORD_HASHER.params();
+		let params = Params::try_from(&password_hash)?;
+
+		Ok(params.m_cost() < current.m_cost()
+			|| params.t_cost() < current.t_cost()
+			|| params.p_cost() < current.p_cost())
+	}
 
-		Ok(hashed_password)
+	/// Replace the password hash of this [`Profile`] with a hash using the
+	/// current hashing parameters
+	#[instrument(skip(password, conn))]
+	pub async fn rehash_password(
+		mut self,
+		password: &str,
+		conn: &DbConn,
+	) -> Result<Self, Error> {
+		let self_id = self.primitive.id;
+		let new_password_hash = Self::hash_password(password).await?;
+
+		self.primitive.password_hash = new_password_hash.clone();
+
+		conn.interact(move |conn| {
+			use self::profile::dsl::*;
+
+			diesel::update(profile.find(self_id))
+				.set(password_hash.eq(new_password_hash))
+				.execute(conn)
+		})
+		.await??;
+
+		info!("rehashed password for profile {self_id}");
+
+		Ok(self)
 	}
 
 	/// Change the password for a [`Profile`]
@@ -332,7 +482,7 @@ impl Profile {
 		conn: &DbConn,
 	) -> Result<Self, Error> {
 		let self_id = self.primitive.id;
-		let new_password_hash = Self::hash_password(new_password)?;
+		let new_password_hash = Self::hash_password(new_password).await?;
 
 		conn.interact(move |conn| {
 			use self::profile::dsl::*;
@@ -352,15 +502,33 @@ impl Profile {
 		Ok(profile)
 	}
 
-	/// Set the `last_login_at` field to the current datetime for the given
+	/// Set the `last_login_at` field to the given login time for the given
 	/// [`Profile`]
 	#[instrument(skip(conn))]
 	pub async fn update_last_login(
 		mut self,
+		login_time: NaiveDateTime,
 		conn: &DbConn,
 	) -> Result<Self, Error> {
-		self.primitive.last_login_at = Utc::now().naive_utc();
-		self.update(conn).await
+		let self_id = self.primitive.id;
+
+		// Only touch the login timestamp instead of writing back and reloading
+		// the entire profile
+		let new_updated_at: NaiveDateTime = conn
+			.interact(move |conn| {
+				use self::profile::dsl::*;
+
+				diesel::update(profile.find(self_id))
+					.set(last_login_at.eq(login_time))
+					.returning(updated_at)
+					.get_result(conn)
+			})
+			.await??;
+
+		self.primitive.last_login_at = login_time;
+		self.primitive.updated_at = new_updated_at;
+
+		Ok(self)
 	}
 
 	/// Get or create a [`Profile`] from a set of login claims
@@ -457,7 +625,7 @@ impl NewProfile {
 	/// Insert this [`NewProfile`]
 	#[instrument(skip(conn))]
 	pub async fn insert(self, conn: &DbConn) -> Result<Profile, Error> {
-		let hash = Profile::hash_password(&self.password)?;
+		let hash = Profile::hash_password(&self.password).await?;
 
 		let insertable = NewProfileHashed {
 			username:                        self.username,
@@ -481,7 +649,8 @@ impl NewProfile {
 			})
 			.await??;
 
-		let profile = Profile::get(profile.id, conn).await?;
+		// A freshly inserted profile can't have an avatar yet
+		let profile = Profile { primitive: profile, avatar: None };
 
 		Ok(profile)
 	}
@@ -517,7 +686,7 @@ impl NewProfileDirect {
 			})
 			.await??;
 
-		let profile = Profile::get(profile.id, conn).await?;
+		let profile = Profile { primitive: profile, avatar: None };
 
 		info!("direct-inserted new profile with id {}", profile.primitive.id);
 
@@ -575,12 +744,14 @@ impl ProfileStats {
 		profile_id: i32,
 		conn: &DbConn,
 	) -> Result<Self, Error> {
-		let reservation_data = conn
+		let now = Utc::now().naive_utc();
+
+		let stats = conn
 			.interact(move |c| {
 				use self::opening_time::dsl as ot_dsl;
 				use self::reservation::dsl as r_dsl;
 
-				r_dsl::reservation
+				let reservation_data = r_dsl::reservation
 					.inner_join(
 						ot_dsl::opening_time
 							.on(r_dsl::opening_time_id.eq(ot_dsl::id)),
@@ -592,49 +763,48 @@ impl ProfileStats {
 						ot_dsl::end_time,
 						r_dsl::state,
 					))
-					.load::<(
+					.load_iter::<(
 						i32,
 						chrono::NaiveDate,
 						chrono::NaiveTime,
 						ReservationState,
-					)>(c)
-			})
-			.await??;
-
-		let now = Utc::now().naive_utc();
-		let mut total_reservations: usize = 0;
-		let mut completed_reservations: usize = 0;
-		let mut upcoming_reservations: usize = 0;
-		let mut total_reservation_hours: usize = 0;
-
-		for data in reservation_data {
-			let (block_count, day, end_time, state) = data;
-
-			// Calculate total hours for this reservation
-			let reservation_minutes =
-				block_count * RESERVATION_BLOCK_SIZE_MINUTES;
-			total_reservation_hours += (reservation_minutes as usize) / 60;
-
-			// Determine if reservation is past or future
-			let reservation_end = day.and_time(end_time);
-
-			if reservation_end > now {
-				if state != ReservationState::Cancelled {
-					upcoming_reservations += 1;
+					), DefaultLoadingMode>(c)?;
+
+				let mut stats = ProfileStats {
+					total_reservations:      0,
+					completed_reservations:  0,
+					upcoming_reservations:   0,
+					total_reservation_hours: 0,
+				};
+
+				// Rows are folded into the totals as they are read instead of
+				// being collected first
+				for data in reservation_data {
+					let (block_count, day, end_time, state) = data?;
+
+					// Calculate total hours for this reservation
+					let reservation_minutes =
+						block_count * RESERVATION_BLOCK_SIZE_MINUTES;
+					stats.total_reservation_hours +=
+						(reservation_minutes as usize) / 60;
+
+					// Determine if reservation is past or future
+					let reservation_end = day.and_time(end_time);
+
+					if reservation_end > now {
+						if state != ReservationState::Cancelled {
+							stats.upcoming_reservations += 1;
+						}
+					} else {
+						stats.completed_reservations += 1;
+					}
+
+					stats.total_reservations += 1;
 				}
-			} else {
-				completed_reservations += 1;
-			}
 
-			total_reservations += 1;
-		}
-
-		let stats = ProfileStats {
-			total_reservations,
-			completed_reservations,
-			upcoming_reservations,
-			total_reservation_hours,
-		};
+				Ok::<_, Error>(stats)
+			})
+			.await??;
 
 		Ok(stats)
 	}
@@ -7,7 +7,6 @@ use db::{
 	CreatorAlias,
 	UpdaterAlias,
 	creator,
-	location,
 	location_tag,
 	profile,
 	tag,
@@ -129,7 +128,9 @@ impl Tag {
 		conn.interact(move |conn| {
 			use self::tag::dsl::*;
 
-			diesel::delete(tag.find(tag_id)).execute(conn)
+			diesel::delete(tag.find(tag_id))
+				.returning(id)
+				.get_result::<i32>(conn)
 		})
 		.await??;
 
@@ -149,13 +150,11 @@ impl Tag {
 
 		let tags = conn
 			.interact(move |conn| {
-				use self::location;
 				use self::location_tag::dsl::*;
 				use self::tag::dsl::*;
 
-				location::table
-					.find(l_id)
-					.inner_join(location_tag.on(location_id.eq(location::id)))
+				location_tag
+					.filter(location_id.eq(l_id))
 					.inner_join(query.on(tag_id.eq(id)))
 					.select(Self::as_select())
 					.get_results(conn)
@@ -176,15 +175,13 @@ impl Tag {
 
 		let tags = conn
 			.interact(move |conn| {
-				use self::location;
 				use self::location_tag::dsl::*;
 				use self::tag::dsl::*;
 
-				location::table
-					.filter(location::id.eq_any(l_ids))
-					.inner_join(location_tag.on(location_id.eq(location::id)))
+				location_tag
+					.filter(location_id.eq_any(l_ids))
 					.inner_join(query.on(tag_id.eq(id)))
-					.select((location::id, Self::as_select()))
+					.select((location_id, Self::as_select()))
 					.get_results(conn)
 			})
 			.await??;
@@ -204,7 +201,8 @@ pub struct NewLocationTag {
 impl Tag {
 	/// Set a list of location-tag crossovers
 	///
-	/// This removes the previous list of location tags for this location
+	/// This removes the previous list of location tags for this location,
+	/// repeated tags in the new list are ignored
 	#[instrument(skip(conn))]
 	pub async fn bulk_set(
 		l_id: i32,
@@ -223,7 +221,10 @@ impl Tag {
 				diesel::delete(location_tag.filter(location_id.eq(l_id)))
 					.execute(conn)?;
 
-				diesel::insert_into(location_tag).values(new_tags).execute(conn)
+				diesel::insert_into(location_tag)
+					.values(new_tags)
+					.on_conflict_do_nothing()
+					.execute(conn)
 			})
 		})
 		.await??;
@@ -254,7 +255,7 @@ impl NewTag {
 		includes: TagIncludes,
 		conn: &DbConn,
 	) -> Result<Tag, Error> {
-		let tag = conn
+		let (tag, name) = conn
 			.interact(move |conn| {
 				conn.transaction::<_, Error, _>(|conn| {
 					use self::tag::dsl::tag;
@@ -275,12 +276,18 @@ impl NewTag {
 						.returning(PrimitiveTag::as_returning())
 						.get_result(conn)?;
 
-					Ok(new_tag)
+					Ok((new_tag, name_translation))
 				})
 			})
 			.await??;
 
-		let tag = Tag::get_by_id(tag.id, includes, conn).await?;
+		// Both inserted rows are already known, only the creator profile
+		// would need another query
+		let tag = if includes.created_by {
+			Tag::get_by_id(tag.id, includes, conn).await?
+		} else {
+			Tag { primitive: tag, name, created_by: None, updated_by: None }
+		};
 
 		info!("created tag {tag:?}");
 
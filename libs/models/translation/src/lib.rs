@@ -95,7 +95,9 @@ impl Translation {
 		conn.interact(move |conn| {
 			use self::translation::dsl::*;
 
-			diesel::delete(translation.find(tr_id)).execute(conn)
+			diesel::delete(translation.find(tr_id))
+				.returning(id)
+				.get_result::<i32>(conn)
 		})
 		.await??;
 
@@ -134,8 +136,17 @@ impl NewTranslation {
 			})
 			.await??;
 
-		let translation =
-			Translation::get_by_id(translation.id, includes, conn).await?;
+		// A new translation has no updater yet, so the creator is the only
+		// relation that could require another query
+		let translation = if includes.created_by {
+			Translation::get_by_id(translation.id, includes, conn).await?
+		} else {
+			Translation {
+				primitive:  translation,
+				created_by: None,
+				updated_by: None,
+			}
+		};
 
 		info!("created translation {translation:?}");
 
@@ -161,14 +172,27 @@ impl TranslationUpdate {
 		includes: TranslationIncludes,
 		conn: &DbConn,
 	) -> Result<Translation, Error> {
-		conn.interact(move |conn| {
-			use self::translation::dsl::*;
+		let translation = conn
+			.interact(move |conn| {
+				use self::translation::dsl::*;
 
-			diesel::update(translation.find(tr_id)).set(self).execute(conn)
-		})
-		.await??;
+				diesel::update(translation.find(tr_id))
+					.set(self)
+					.returning(PrimitiveTranslation::as_returning())
+					.get_result(conn)
+			})
+			.await??;
 
-		let translation = Translation::get_by_id(tr_id, includes, conn).await?;
+		// The updated row is returned directly, profiles still need a reload
+		let translation = if includes.created_by || includes.updated_by {
+			Translation::get_by_id(tr_id, includes, conn).await?
+		} else {
+			Translation {
+				primitive:  translation,
+				created_by: None,
+				updated_by: None,
+			}
+		};
 
 		info!("updated translation {translation:?}");
 
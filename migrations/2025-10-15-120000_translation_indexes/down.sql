@@ -0,0 +1,4 @@
+DROP INDEX idx__institution__name_translation_id;
+DROP INDEX idx__tag__name_translation_id;
+DROP INDEX idx__location__excerpt_id;
+DROP INDEX idx__location__description_id;
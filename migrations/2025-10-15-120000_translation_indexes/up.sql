@@ -0,0 +1,4 @@
+CREATE INDEX idx__location__description_id ON location(description_id);
+CREATE INDEX idx__location__excerpt_id ON location(excerpt_id);
+CREATE INDEX idx__tag__name_translation_id ON tag(name_translation_id);
+CREATE INDEX idx__institution__name_translation_id ON institution(name_translation_id);
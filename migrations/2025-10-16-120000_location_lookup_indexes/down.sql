@@ -0,0 +1,2 @@
+DROP INDEX idx__location__created_by;
+DROP INDEX idx__location__authority_id;
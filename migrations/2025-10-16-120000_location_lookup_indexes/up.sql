@@ -0,0 +1,2 @@
+CREATE INDEX idx__location__authority_id ON location(authority_id);
+CREATE INDEX idx__location__created_by ON location(created_by);
@@ -1,4 +1,4 @@
-use std::sync::Arc;
+use std::sync::{Arc, LazyLock};
 
 use chrono::Duration;
 use deadpool_diesel::postgres::{Manager, Pool};
@@ -22,12 +22,18 @@ fn get_env_default(var: &str, default: impl Into<String>) -> String {
 	})
 }
 
+/// Configuration read from the environment, this is only done once per process
+static ENV_CONFIG: LazyLock<Config> = LazyLock::new(Config::read_env);
+
 /// Configuration settings for the application
 #[derive(Clone, Debug)]
 pub struct Config {
 	pub database_url: String,
 	pub redis_url:    String,
 
+	pub database_pool_size:         usize,
+	pub database_pool_wait_timeout: std::time::Duration,
+
 	pub production:  bool,
 	pub skip_verify: bool,
 
@@ -51,13 +57,29 @@ pub struct Config {
 impl Config {
 	/// Create a new [`Config`] from environment variables
 	///
+	/// The environment and secrets are only read the first time this is
+	/// called, later calls return a copy of the same configuration
+	///
 	/// # Panics
 	/// Panics if a required environment variable is missing
 	#[must_use]
-	pub fn from_env() -> Self {
+	pub fn from_env() -> Self { ENV_CONFIG.clone() }
+
+	/// Read the configuration from environment variables
+	fn read_env() -> Self {
 		let database_url = get_env("DATABASE_URL");
 		let redis_url = get_env("REDIS_URL");
 
+		let database_pool_size = get_env_default("DATABASE_POOL_SIZE", "32")
+			.parse::<usize>()
+			.expect("INVALID DATABASE POOL SIZE");
+
+		let database_pool_wait_timeout = std::time::Duration::from_secs(
+			get_env_default("DATABASE_POOL_WAIT_TIMEOUT_SECONDS", "30")
+				.parse::<u64>()
+				.expect("INVALID DATABASE POOL WAIT TIMEOUT"),
+		);
+
 		let production =
 			get_env_default("PRODUCTION", "false").parse::<bool>().unwrap();
 
@@ -116,6 +138,8 @@ impl Config {
 		Self {
 			database_url,
 			redis_url,
+			database_pool_size,
+			database_pool_wait_timeout,
 			production,
 			skip_verify,
 			backend_url,
@@ -144,7 +168,19 @@ impl Config {
 			deadpool_diesel::Runtime::Tokio1,
 		);
 
-		Pool::builder(manager).build().unwrap()
+		// Waiting on the pool is bounded so requests fail instead of piling up
+		// when the database is overloaded, connections are verified with a
+		// test query before being handed out. Opening or verifying a
+		// connection is bounded by the same timeout so an unreachable database
+		// can't stall a request past it
+		Pool::builder(manager)
+			.max_size(self.database_pool_size)
+			.wait_timeout(Some(self.database_pool_wait_timeout))
+			.create_timeout(Some(self.database_pool_wait_timeout))
+			.recycle_timeout(Some(self.database_pool_wait_timeout))
+			.runtime(deadpool_diesel::Runtime::Tokio1)
+			.build()
+			.unwrap()
 	}
 
 	/// Create a stub mailbox based on the current config
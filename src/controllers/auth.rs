@@ -1,6 +1,5 @@
 //! Controllers for authorization
 
-use argon2::{Argon2, PasswordHash, PasswordVerifier};
 use axum::Json;
 use axum::extract::{Path, State};
 use axum::http::StatusCode;
@@ -24,12 +23,13 @@ use crate::schemas::auth::{
 	RegisterRequest,
 };
 use crate::schemas::profile::ProfileResponse;
-use crate::{Config, Session};
+use crate::{Config, Session, SessionCache};
 
-#[instrument(skip(pool, r_conn, config, mailer, jar))]
+#[instrument(skip(pool, r_conn, session_cache, config, mailer, jar))]
 pub(crate) async fn register_profile(
 	State(pool): State<DbPool>,
 	State(mut r_conn): State<RedisConn>,
+	State(session_cache): State<SessionCache>,
 	State(config): State<Config>,
 	State(mailer): State<Mailer>,
 	jar: PrivateCookieJar,
@@ -37,9 +37,11 @@ pub(crate) async fn register_profile(
 ) -> Result<impl IntoResponse, Error> {
 	register_data.validate()?;
 
+	let now = Utc::now().naive_utc();
+
 	let email_confirmation_token = Uuid::new_v4().to_string();
 	let email_confirmation_token_expiry =
-		Utc::now().naive_utc() + config.email_confirmation_token_lifetime;
+		now + config.email_confirmation_token_lifetime;
 
 	let insertable_profile = NewProfile {
 		username: register_data.username,
@@ -60,6 +62,7 @@ pub(crate) async fn register_profile(
 		let session = Session::create(
 			config.access_cookie_lifetime,
 			&profile,
+			&session_cache,
 			&mut r_conn,
 		)
 		.await?;
@@ -72,7 +75,7 @@ pub(crate) async fn register_profile(
 
 		let jar = jar.add(access_token_cookie);
 
-		let profile = profile.update_last_login(&conn).await?;
+		let profile = profile.update_last_login(now, &conn).await?;
 
 		info!("confirmed email for profile {}", profile.primitive.id);
 
@@ -83,12 +86,12 @@ pub(crate) async fn register_profile(
 		// Unwrap is safe as the token was explicitly set in the insertable
 		// profile
 		let confirmation_token =
-			new_profile.primitive.email_confirmation_token.clone().unwrap();
+			new_profile.primitive.email_confirmation_token.as_deref().unwrap();
 
 		mailer
 			.send_confirm_email(
 				&new_profile,
-				&confirmation_token,
+				confirmation_token,
 				&config.frontend_url,
 			)
 			.await?;
@@ -137,10 +140,11 @@ pub(crate) async fn resend_confirmation_email(
 	Ok(NoContent)
 }
 
-#[instrument(skip(pool, r_conn, config, jar))]
+#[instrument(skip(pool, r_conn, session_cache, config, jar))]
 pub(crate) async fn confirm_email(
 	State(pool): State<DbPool>,
 	State(mut r_conn): State<RedisConn>,
+	State(session_cache): State<SessionCache>,
 	State(config): State<Config>,
 	jar: PrivateCookieJar,
 	Path(token): Path<String>,
@@ -152,15 +156,20 @@ pub(crate) async fn confirm_email(
 	// Unwrap is safe because profiles with a confirmation token will always
 	// have a token expiry
 	let expiry = profile.primitive.email_confirmation_token_expiry.unwrap();
-	if Utc::now().naive_utc() > expiry {
+	let now = Utc::now().naive_utc();
+	if now > expiry {
 		return Err(TokenError::ExpiredEmailToken.into());
 	}
 
 	profile.confirm_email(&conn).await?;
 
-	let session =
-		Session::create(config.access_cookie_lifetime, &profile, &mut r_conn)
-			.await?;
+	let session = Session::create(
+		config.access_cookie_lifetime,
+		&profile,
+		&session_cache,
+		&mut r_conn,
+	)
+	.await?;
 
 	let access_token_cookie = session.to_access_token_cookie(
 		config.access_cookie_name,
@@ -170,7 +179,7 @@ pub(crate) async fn confirm_email(
 
 	let jar = jar.add(access_token_cookie);
 
-	let profile = profile.update_last_login(&conn).await?;
+	let profile = profile.update_last_login(now, &conn).await?;
 
 	info!("confirmed email for profile {}", profile.primitive.id);
 
@@ -213,6 +222,7 @@ pub(crate) async fn reset_password(
 	State(pool): State<DbPool>,
 	State(config): State<Config>,
 	State(mut r_conn): State<RedisConn>,
+	State(session_cache): State<SessionCache>,
 	jar: PrivateCookieJar,
 	Json(request): Json<PasswordResetData>,
 ) -> Result<(PrivateCookieJar, NoContent), Error> {
@@ -225,15 +235,20 @@ pub(crate) async fn reset_password(
 	// Unwrap is safe because profiles with a reset token will always
 	// have a token expiry
 	let expiry = profile.primitive.password_reset_token_expiry.unwrap();
-	if Utc::now().naive_utc() > expiry {
+	let now = Utc::now().naive_utc();
+	if now > expiry {
 		return Err(TokenError::ExpiredPasswordToken.into());
 	}
 
 	let profile = profile.change_password(&request.password, &conn).await?;
 
-	let session =
-		Session::create(config.access_cookie_lifetime, &profile, &mut r_conn)
-			.await?;
+	let session = Session::create(
+		config.access_cookie_lifetime,
+		&profile,
+		&session_cache,
+		&mut r_conn,
+	)
+	.await?;
 
 	let access_token_cookie = session.to_access_token_cookie(
 		config.access_cookie_name,
@@ -243,7 +258,7 @@ pub(crate) async fn reset_password(
 
 	let jar = jar.add(access_token_cookie);
 
-	let profile = profile.update_last_login(&conn).await?;
+	let profile = profile.update_last_login(now, &conn).await?;
 
 	info!("reset password for profile {}", profile.primitive.id);
 
@@ -254,6 +269,7 @@ pub(crate) async fn reset_password(
 pub(crate) async fn login_profile(
 	State(pool): State<DbPool>,
 	State(mut r_conn): State<RedisConn>,
+	State(session_cache): State<SessionCache>,
 	State(config): State<Config>,
 	jar: PrivateCookieJar,
 	Json(login_data): Json<LoginRequest>,
@@ -270,10 +286,17 @@ pub(crate) async fn login_profile(
 		},
 	}
 
-	let password_hash = PasswordHash::new(&profile.primitive.password_hash)?;
+	profile.verify_password(&login_data.password).await?;
 
-	Argon2::default()
-		.verify_password(login_data.password.as_bytes(), &password_hash)?;
+	// Upgrade hashes created with outdated parameters now that the plain
+	// password is known
+	let profile = if profile.password_needs_rehash()? {
+		profile.rehash_password(&login_data.password, &conn).await?
+	} else {
+		profile
+	};
+
+	let now = Utc::now().naive_utc();
 
 	let access_token_lifetime = if login_data.remember {
 		Duration::days(45)
@@ -281,8 +304,13 @@ pub(crate) async fn login_profile(
 		config.access_cookie_lifetime
 	};
 
-	let session =
-		Session::create(access_token_lifetime, &profile, &mut r_conn).await?;
+	let session = Session::create(
+		access_token_lifetime,
+		&profile,
+		&session_cache,
+		&mut r_conn,
+	)
+	.await?;
 
 	let access_token_cookie = session.to_access_token_cookie(
 		config.access_cookie_name,
@@ -292,24 +320,25 @@ pub(crate) async fn login_profile(
 
 	let jar = jar.add(access_token_cookie);
 
-	let profile = profile.update_last_login(&conn).await?;
+	let profile = profile.update_last_login(now, &conn).await?;
 
 	info!("logged in profile {} with username", profile.primitive.id);
 
 	Ok((jar, NoContent))
 }
 
-#[instrument(skip(config, jar))]
+#[instrument(skip(config, session_cache, jar))]
 pub(crate) async fn logout_profile(
 	State(config): State<Config>,
 	State(mut r_conn): State<RedisConn>,
+	State(session_cache): State<SessionCache>,
 	jar: PrivateCookieJar,
 	session: Session,
 ) -> Result<(PrivateCookieJar, NoContent), Error> {
 	let access_token = Cookie::build(config.access_cookie_name).path("/");
 	let jar = jar.remove(access_token);
 
-	Session::delete(session.id, &mut r_conn).await?;
+	Session::delete(session.id, &session_cache, &mut r_conn).await?;
 
 	info!("logged out profile {}", session.data.profile_id);
 
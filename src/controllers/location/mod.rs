@@ -36,7 +36,7 @@ use crate::schemas::opening_time::OpeningTimeResponse;
 use crate::schemas::pagination::PaginationOptions;
 use crate::schemas::reservation::ReservationResponse;
 use crate::schemas::tag::SetLocationTagsRequest;
-use crate::{Config, Session};
+use crate::{Config, Session, TranslationCache};
 
 mod image;
 mod member;
@@ -57,10 +57,10 @@ pub(crate) async fn create_location(
 	Query(includes): Query<LocationIncludes>,
 	Json(request): Json<CreateLocationRequest>,
 ) -> Result<impl IntoResponse, Error> {
-	let conn = pool.get().await?;
-
 	request.validate()?;
 
+	let conn = pool.get().await?;
+
 	let new_location = request.to_insertable(session.data.profile_id);
 	let records = new_location.insert(includes, &conn).await?;
 	let response = records.build_response(includes, &config)?;
@@ -218,7 +218,7 @@ pub(crate) async fn search_locations(
 	let tags = tags?;
 	let imgs = imgs?;
 
-	let locations = Location::group(locations, &times, &tags, &imgs);
+	let locations = Location::group(locations, times, tags, imgs);
 
 	let locations: Vec<LocationResponse> = locations
 		.into_iter()
@@ -326,9 +326,10 @@ pub(crate) async fn reject_location(
 }
 
 /// Delete a location from the database.
-#[instrument(skip(pool))]
+#[instrument(skip(pool, translation_cache))]
 pub(crate) async fn delete_location(
 	State(pool): State<DbPool>,
+	State(translation_cache): State<TranslationCache>,
 	session: Session,
 	Path(id): Path<i32>,
 ) -> Result<impl IntoResponse, Error> {
@@ -363,6 +364,10 @@ pub(crate) async fn delete_location(
 
 	Location::delete_by_id(id, &conn).await?;
 
+	// The location's translations were deleted along with it
+	translation_cache.remove(location.description_id);
+	translation_cache.remove(location.excerpt_id);
+
 	Ok((StatusCode::NO_CONTENT, NoContent))
 }
 
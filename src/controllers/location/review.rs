@@ -20,9 +20,9 @@ pub async fn create_location_review(
 	Path(id): Path<i32>,
 	Json(request): Json<CreateReviewRequest>,
 ) -> Result<impl IntoResponse, Error> {
-	let conn = pool.get().await?;
-
 	let new_review = request.to_insertable(session.data.profile_id, id)?;
+
+	let conn = pool.get().await?;
 	let review = new_review.insert(&conn).await?;
 	let response: ReviewResponse = review.into();
 
@@ -54,9 +54,9 @@ pub async fn update_location_review(
 	Path((l_id, r_id)): Path<(i32, i32)>,
 	Json(request): Json<UpdateReviewRequest>,
 ) -> Result<impl IntoResponse, Error> {
-	let conn = pool.get().await?;
-
 	let review_update = request.to_insertable()?;
+
+	let conn = pool.get().await?;
 	let updated_review = review_update.apply_to(r_id, &conn).await?;
 	let response: ReviewResponse = updated_review.into();
 
@@ -3,7 +3,8 @@
 use axum::extract::State;
 use axum::response::NoContent;
 use common::Error;
-use diesel::{RunQueryDsl, sql_query};
+use diesel::sql_types::Integer;
+use diesel::{IntoSql, RunQueryDsl};
 
 use crate::DbPool;
 
@@ -23,7 +24,10 @@ pub(crate) async fn healthcheck(
 ) -> Result<NoContent, Error> {
 	let conn = pool.get().await?;
 
-	conn.interact(|conn| sql_query("SELECT 1").execute(conn)).await??;
+	// Raw `sql_query` statements are never kept in diesel's prepared statement
+	// cache, a DSL select is prepared once per connection
+	conn.interact(|conn| diesel::select(1.into_sql::<Integer>()).execute(conn))
+		.await??;
 
 	Ok(NoContent)
 }
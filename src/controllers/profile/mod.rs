@@ -1,10 +1,10 @@
 //! Controllers for [`Profile`]s
 
 use authority::{Authority, AuthorityIncludes};
-use axum::extract::{Path, Query, Request, State};
+use axum::Json;
+use axum::extract::{Path, Query, State};
 use axum::http::StatusCode;
 use axum::response::{IntoResponse, NoContent};
-use axum::{Json, RequestExt};
 use axum_extra::extract::PrivateCookieJar;
 use common::{DbPool, Error, RedisConn};
 use db::ProfileState;
@@ -26,7 +26,7 @@ use crate::schemas::profile::{
 };
 use crate::schemas::reservation::ReservationResponse;
 use crate::schemas::review::ReviewResponse;
-use crate::{AdminSession, AppState, Config, Session};
+use crate::{AdminSession, Config, Session, SessionCache};
 
 mod avatar;
 
@@ -54,35 +54,29 @@ pub async fn get_all_profiles(
 	Ok(Json(paginated))
 }
 
-/// # Panics
-/// Panics if the request doesn't have a valid cookie jar
-#[instrument(skip(state, config, pool))]
+#[instrument(skip(pool, r_conn, session_cache, config, jar))]
 pub async fn get_current_profile(
-	State(state): State<AppState>,
-	State(config): State<Config>,
 	State(pool): State<DbPool>,
-	mut req: Request,
+	State(mut r_conn): State<RedisConn>,
+	State(session_cache): State<SessionCache>,
+	State(config): State<Config>,
+	jar: PrivateCookieJar,
 ) -> Result<impl IntoResponse, Error> {
-	let conn = pool.get().await?;
-
-	let jar = req
-		.extract_parts_with_state::<PrivateCookieJar, _>(&state)
-		.await
-		.unwrap();
-
-	let mut r_conn = state.redis_connection;
-
-	let Some(access_token) = jar.get(&state.config.access_cookie_name) else {
+	let Some(session_id) =
+		Session::id_from_jar(&jar, &config.access_cookie_name)
+	else {
 		return Ok((StatusCode::OK, Json(None)));
 	};
 
-	// Unwrap is safe as correctly signed access tokens are always i32
-	let session_id = access_token.value().parse::<i32>().unwrap();
-
-	let Ok(Some(session)) = Session::get(session_id, &mut r_conn).await else {
+	let Ok(Some(session)) =
+		Session::get(session_id, &session_cache, &mut r_conn).await
+	else {
 		return Ok((StatusCode::OK, Json(None)));
 	};
 
+	// Only take a connection once it is known to be needed
+	let conn = pool.get().await?;
+
 	let profile = Profile::get(session.data.profile_id, &conn).await?;
 	let response = profile.build_response((), &config)?;
 
@@ -208,10 +202,11 @@ pub async fn update_profile(
 	Ok((StatusCode::OK, Json(response)))
 }
 
-#[instrument(skip(pool))]
+#[instrument(skip(pool, session_cache))]
 pub async fn disable_profile(
 	State(pool): State<DbPool>,
 	State(mut r_conn): State<RedisConn>,
+	State(session_cache): State<SessionCache>,
 	session: AdminSession,
 	Path(profile_id): Path<i32>,
 ) -> Result<NoContent, Error> {
@@ -221,7 +216,7 @@ pub async fn disable_profile(
 	profile.primitive.state = ProfileState::Disabled;
 	profile.update(&conn).await?;
 
-	Session::delete(profile_id, &mut r_conn).await?;
+	Session::delete(profile_id, &session_cache, &mut r_conn).await?;
 
 	info!("disabled profile {profile_id}");
 
@@ -7,7 +7,7 @@ use tag::{Tag, TagIncludes};
 
 use crate::schemas::BuildResponse;
 use crate::schemas::tag::{CreateTagRequest, TagResponse, UpdateTagRequest};
-use crate::{AdminSession, Config};
+use crate::{AdminSession, Config, TranslationCache};
 
 #[instrument(skip(pool))]
 pub async fn create_tag(
@@ -43,10 +43,11 @@ pub async fn get_all_tags(
 	Ok((StatusCode::OK, Json(response)))
 }
 
-#[instrument(skip(pool))]
+#[instrument(skip(pool, translation_cache))]
 pub async fn update_tag(
 	State(config): State<Config>,
 	State(pool): State<DbPool>,
+	State(translation_cache): State<TranslationCache>,
 	session: AdminSession,
 	Query(includes): Query<TagIncludes>,
 	Path(id): Path<i32>,
@@ -56,6 +57,10 @@ pub async fn update_tag(
 
 	let tag_update = request.to_insertable(session.data.profile_id);
 	let updated_tag = tag_update.apply_to(id, includes, &conn).await?;
+
+	translation_cache
+		.insert(updated_tag.name.id, updated_tag.name.clone().into());
+
 	let response: TagResponse =
 		updated_tag.build_response(includes, &config)?;
 
@@ -10,15 +10,17 @@ use translation::{Translation, TranslationIncludes};
 use crate::schemas::BuildResponse;
 use crate::schemas::translation::{
 	CreateTranslationRequest,
+	TranslationResponse,
 	UpdateTranslationRequest,
 };
-use crate::{Config, Session};
+use crate::{Config, Session, TranslationCache};
 
 /// Create and store a single translation in the database.
-#[instrument(skip(pool))]
+#[instrument(skip(pool, translation_cache))]
 pub(crate) async fn create_translation(
 	State(config): State<Config>,
 	State(pool): State<DbPool>,
+	State(translation_cache): State<TranslationCache>,
 	session: Session,
 	Query(includes): Query<TranslationIncludes>,
 	Json(request): Json<CreateTranslationRequest>,
@@ -29,30 +31,48 @@ pub(crate) async fn create_translation(
 	let translation = new_tr.insert(includes, &conn).await?;
 	let response = translation.build_response(includes, &config)?;
 
+	if !includes.created_by && !includes.updated_by {
+		translation_cache.insert(response.id, response.clone());
+	}
+
 	Ok((StatusCode::CREATED, Json(response)))
 }
 
 /// Get a specific translation with a given key and language
-#[instrument(skip(pool))]
+#[instrument(skip(pool, translation_cache))]
 pub(crate) async fn get_translation(
 	State(config): State<Config>,
 	State(pool): State<DbPool>,
+	State(translation_cache): State<TranslationCache>,
 	Path(id): Path<i32>,
 	Query(includes): Query<TranslationIncludes>,
 ) -> Result<impl IntoResponse, Error> {
+	// Included profiles can change independently, so only plain
+	// translations are cached
+	let cacheable = !includes.created_by && !includes.updated_by;
+
+	if cacheable && let Some(response) = translation_cache.get(id) {
+		return Ok((StatusCode::OK, Json(response)));
+	}
+
 	let conn = pool.get().await?;
 
 	let translation = Translation::get_by_id(id, includes, &conn).await?;
 	let response = translation.build_response(includes, &config)?;
 
+	if cacheable {
+		translation_cache.insert_if_absent(id, response.clone());
+	}
+
 	Ok((StatusCode::OK, Json(response)))
 }
 
 /// Update the translation with the given id.
-#[instrument(skip(pool))]
+#[instrument(skip(pool, translation_cache))]
 pub(crate) async fn update_translation(
 	State(config): State<Config>,
 	State(pool): State<DbPool>,
+	State(translation_cache): State<TranslationCache>,
 	session: Session,
 	Path(id): Path<i32>,
 	Query(includes): Query<TranslationIncludes>,
@@ -65,18 +85,32 @@ pub(crate) async fn update_translation(
 	let updated_tr = tr_update.apply_to(id, includes, &conn).await?;
 	let response = updated_tr.build_response(includes, &config)?;
 
+	// Write the fresh translation through without its included profiles, the
+	// shape it is cached in
+	translation_cache.insert(
+		id,
+		TranslationResponse {
+			created_by: None,
+			updated_by: None,
+			..response.clone()
+		},
+	);
+
 	Ok((StatusCode::OK, Json(response)))
 }
 
 /// Delete the translation with the given id.
-#[instrument(skip(pool))]
+#[instrument(skip(pool, translation_cache))]
 pub(crate) async fn delete_translation(
 	State(pool): State<DbPool>,
+	State(translation_cache): State<TranslationCache>,
 	Path(id): Path<i32>,
 ) -> Result<impl IntoResponse, Error> {
 	let conn = pool.get().await?;
 
 	Translation::delete_by_id(id, &conn).await?;
 
+	translation_cache.remove(id);
+
 	Ok((StatusCode::NO_CONTENT, NoContent))
 }
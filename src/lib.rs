@@ -13,6 +13,7 @@ use mailer::Mailer;
 mod config;
 mod seeder;
 mod session;
+mod translation_cache;
 
 pub mod controllers;
 pub mod mailer;
@@ -23,15 +24,18 @@ pub mod schemas;
 pub use config::*;
 pub use seeder::*;
 pub use session::*;
+pub use translation_cache::*;
 
 /// Common state of the app
 #[derive(Clone)]
 pub struct AppState {
-	pub config:           Config,
-	pub database_pool:    DbPool,
-	pub redis_connection: RedisConn,
-	pub cookie_jar_key:   Key,
-	pub mailer:           Mailer,
+	pub config:            Config,
+	pub database_pool:     DbPool,
+	pub redis_connection:  RedisConn,
+	pub cookie_jar_key:    Key,
+	pub mailer:            Mailer,
+	pub session_cache:     SessionCache,
+	pub translation_cache: TranslationCache,
 }
 
 impl FromRef<AppState> for Config {
@@ -53,3 +57,11 @@ impl FromRef<AppState> for Key {
 impl FromRef<AppState> for Mailer {
 	fn from_ref(input: &AppState) -> Self { input.mailer.clone() }
 }
+
+impl FromRef<AppState> for SessionCache {
+	fn from_ref(input: &AppState) -> Self { input.session_cache.clone() }
+}
+
+impl FromRef<AppState> for TranslationCache {
+	fn from_ref(input: &AppState) -> Self { input.translation_cache.clone() }
+}
@@ -14,7 +14,7 @@ use crate::Config;
 /// A basic interface to send email messages
 #[derive(Clone, Debug)]
 pub struct Mailer {
-	from:       Address,
+	from:       Mailbox,
 	send_queue: mpsc::Sender<Message>,
 }
 
@@ -48,7 +48,9 @@ impl Mailer {
 			));
 		}
 
-		Self { from: config.email_address.clone(), send_queue: tx }
+		let from = Mailbox::new(None, config.email_address.clone());
+
+		Self { from, send_queue: tx }
 	}
 
 	/// Try to build an email [`Message`]
@@ -62,7 +64,7 @@ impl Mailer {
 		body: &str,
 	) -> Result<Message, Error> {
 		Ok(Message::builder()
-			.from(Mailbox::new(None, self.from.clone()))
+			.from(self.from.clone())
 			.to(receiver.try_into().map_err(Into::into)?)
 			.subject(subject)
 			.body(body.to_string())?)
@@ -131,9 +133,17 @@ impl Mailer {
 		}
 
 		while let Some(mail) = rx.recv().await {
-			match transport.send(&mail) {
-				Ok(res) => info!("sent email: {res:?}"),
-				Err(e) => error!("error sending email: {e:?}"),
+			// The SMTP transport does blocking network IO, keep it off the
+			// async workers
+			let transport = transport.clone();
+			let result =
+				tokio::task::spawn_blocking(move || transport.send(&mail))
+					.await;
+
+			match result {
+				Ok(Ok(res)) => info!("sent email: {res:?}"),
+				Ok(Err(e)) => error!("error sending email: {e:?}"),
+				Err(e) => error!("email sender task failed: {e:?}"),
 			}
 
 			tokio::time::sleep(std::time::Duration::from_secs(1)).await;
@@ -3,7 +3,7 @@ extern crate tracing;
 
 use axum_extra::extract::cookie::Key;
 use blokmap::mailer::Mailer;
-use blokmap::{AppState, Config, routes};
+use blokmap::{AppState, Config, SessionCache, TranslationCache, routes};
 use tokio::net::TcpListener;
 use tokio::signal;
 use tokio::signal::unix::SignalKind;
@@ -41,6 +41,8 @@ async fn main() {
 		redis_connection,
 		cookie_jar_key,
 		mailer,
+		session_cache: SessionCache::default(),
+		translation_cache: TranslationCache::default(),
 	});
 
 	let listener = TcpListener::bind("0.0.0.0:80").await.unwrap();
@@ -19,11 +19,9 @@ use crate::session::Session;
 /// Middleware layer that guarantees a request has a valid access token and
 /// associated session
 ///
-/// If a valid session is found its ID is stored as an
-/// [`Extension`](axum::Extension)
-///
-/// This function does not extract any session data, controllers that need this
-/// data should ask for a [`Session`] in their arguments
+/// If a valid session is found it is stored as an
+/// [`Extension`](axum::Extension), controllers that need the session data
+/// should ask for a [`Session`] in their arguments
 #[derive(Clone)]
 pub struct AuthLayer {
 	state: AppState,
@@ -84,17 +82,47 @@ where
 				.unwrap();
 
 			let mut r_conn = state.redis_connection;
-			let pool = state.database_pool;
-			let conn = match pool.get().await {
-				Ok(c) => c,
-				Err(e) => {
-					return Ok(Error::from(e).into_response());
-				},
-			};
 
-			if let Some(claims_cookie) =
-				jar.get(&state.config.claims_cookie_name)
-			{
+			let access_session_id =
+				Session::id_from_jar(&jar, &state.config.access_cookie_name);
+
+			let mut session = None;
+
+			if let Some(session_id) = access_session_id {
+				session = match Session::get(
+					session_id,
+					&state.session_cache,
+					&mut r_conn,
+				)
+				.await
+				{
+					Ok(s) => s,
+					Err(e) => return Ok(e.into_response()),
+				};
+			}
+
+			// The claims are only exchanged for a new session when the access
+			// token doesn't point to a live session created from these same
+			// claims, so repeated requests never touch the database while an
+			// account switch still replaces the session
+			let claims_cookie = jar
+				.get(&state.config.claims_cookie_name)
+				.filter(|claims_cookie| {
+					let digest = Session::claims_digest(claims_cookie.value());
+
+					session.is_none_or(|s| s.data.claims_digest != Some(digest))
+				});
+
+			if let Some(claims_cookie) = claims_cookie {
+				// Only claims need the database, most requests can be
+				// authorized without taking a connection from the pool
+				let conn = match state.database_pool.get().await {
+					Ok(c) => c,
+					Err(e) => {
+						return Ok(Error::from(e).into_response());
+					},
+				};
+
 				let claims = match serde_json::from_str::<ProfileClaims>(
 					claims_cookie.value(),
 				) {
@@ -111,55 +139,50 @@ where
 					},
 				};
 
-				let session = Session::create(
+				let created_session = Session::create_from_claims(
 					state.config.access_cookie_lifetime,
 					&profile,
+					claims_cookie.value(),
+					&state.session_cache,
 					&mut r_conn,
 				)
 				.await;
 
-				let session = match session {
+				let created_session = match created_session {
 					Ok(s) => s,
 					Err(e) => {
 						return Ok(e.into_response());
 					},
 				};
 
-				let access_token_cookie = session.to_access_token_cookie(
-					state.config.access_cookie_name.clone(),
-					state.config.access_cookie_lifetime,
-					state.config.production,
-				);
+				let access_token_cookie = created_session
+					.to_access_token_cookie(
+						state.config.access_cookie_name.clone(),
+						state.config.access_cookie_lifetime,
+						state.config.production,
+					);
 
 				jar = jar.add(access_token_cookie);
-			}
 
-			let Some(access_token) = jar.get(&state.config.access_cookie_name)
-			else {
-				info!("got request without valid access token");
-
-				return Ok(
-					Error::from(TokenError::MissingAccessToken).into_response()
-				);
-			};
+				session = Some(created_session);
+			}
 
-			// Unwrap is safe as correctly signed access tokens are always i32
-			let session_id = access_token.value().parse::<i32>().unwrap();
+			let Some(session) = session else {
+				let Some(session_id) = access_session_id else {
+					info!("got request without valid access token");
 
-			let exists = match Session::exists(session_id, &mut r_conn).await {
-				Ok(s) => s,
-				Err(e) => return Ok(e.into_response()),
-			};
+					return Ok(Error::from(TokenError::MissingAccessToken)
+						.into_response());
+				};
 
-			if !exists {
 				warn!("attempted to authorize unknown session {}", session_id);
 
 				return Ok(
 					Error::from(TokenError::MissingSession).into_response()
 				);
-			}
+			};
 
-			req.extensions_mut().insert(session_id);
+			req.extensions_mut().insert(session);
 
 			let res = inner.call(req).await;
 
@@ -37,11 +37,13 @@ impl BuildResponse<ImageResponse> for PrimitiveImage {
 			Err(Error::Infallible("no valid image url".to_string()))
 		};
 
+		// Taking the serialization out of the url avoids formatting it again
+		// for every image in a list
 		let url = url?;
 
 		let response = ImageResponse {
 			id:          self.id,
-			url:         url.to_string(),
+			url:         url.into(),
 			index:       None,
 			uploaded_by: None,
 		};
@@ -130,17 +130,12 @@ impl BuildResponse<LocationResponse> for FullLocationData {
 	) -> Result<LocationResponse, Error> {
 		let (location, (opening_times, tags, images)) = self;
 
-		let authority = location.authority.map(Into::into);
-		let approved_by = location.approved_by.map(Into::into);
-		let rejected_by = location.rejected_by.map(Into::into);
-		let created_by = location.created_by.map(Into::into);
-		let updated_by = location.updated_by.map(Into::into);
-
+		// Related responses are only built for the includes that were asked for
 		Ok(LocationResponse {
 			id:                     location.primitive.id,
 			name:                   location.primitive.name,
 			authority:              if includes.authority {
-				Some(authority)
+				Some(location.authority.map(Into::into))
 			} else {
 				None
 			},
@@ -160,26 +155,26 @@ impl BuildResponse<LocationResponse> for FullLocationData {
 			longitude:              location.primitive.longitude,
 			approved_at:            location.primitive.approved_at,
 			approved_by:            if includes.approved_by {
-				Some(approved_by)
+				Some(location.approved_by.map(Into::into))
 			} else {
 				None
 			},
 			rejected_at:            location.primitive.rejected_at,
 			rejected_by:            if includes.rejected_by {
-				Some(rejected_by)
+				Some(location.rejected_by.map(Into::into))
 			} else {
 				None
 			},
 			rejected_reason:        location.primitive.rejected_reason,
 			created_at:             location.primitive.created_at,
 			created_by:             if includes.created_by {
-				Some(created_by)
+				Some(location.created_by.map(Into::into))
 			} else {
 				None
 			},
 			updated_at:             location.primitive.updated_at,
 			updated_by:             if includes.updated_by {
-				Some(updated_by)
+				Some(location.updated_by.map(Into::into))
 			} else {
 				None
 			},
@@ -40,23 +40,17 @@ impl BuildResponse<TranslationResponse> for Translation {
 		let updated_by = self.updated_by.map(Into::into);
 
 		Ok(TranslationResponse {
-			id:         self.primitive.id,
-			nl:         self.primitive.nl,
-			en:         self.primitive.en,
-			fr:         self.primitive.fr,
-			de:         self.primitive.de,
-			created_at: self.primitive.created_at,
 			created_by: if includes.created_by {
 				Some(created_by)
 			} else {
 				None
 			},
-			updated_at: self.primitive.updated_at,
 			updated_by: if includes.updated_by {
 				Some(updated_by)
 			} else {
 				None
 			},
+			..self.primitive.into()
 		})
 	}
 }
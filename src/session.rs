@@ -1,10 +1,17 @@
 //! User sessions and tokens
 
+use std::collections::HashMap;
+use std::hash::{DefaultHasher, Hash, Hasher};
+use std::sync::Arc;
+use std::time::Instant;
+
 use axum::RequestPartsExt;
-use axum::extract::{FromRequestParts, State};
+use axum::extract::FromRequestParts;
 use axum::http::request::Parts;
+use axum_extra::extract::PrivateCookieJar;
 use axum_extra::extract::cookie::{Cookie, SameSite};
 use common::{Error, InternalServerError, RedisConn};
+use parking_lot::Mutex;
 use profile::Profile;
 use redis::AsyncCommands;
 use serde::{Deserialize, Serialize};
@@ -44,8 +51,69 @@ pub struct AdminSession {
 
 #[derive(Clone, Copy, Debug, Deserialize, Serialize)]
 pub struct SessionData {
-	pub profile_id: i32,
-	pub is_admin:   bool,
+	pub profile_id:    i32,
+	pub is_admin:      bool,
+	/// Digest of the login claims this session was created from, if any
+	#[serde(default)]
+	pub claims_digest: Option<u64>,
+}
+
+/// Process local cache of recently used sessions
+///
+/// This saves a redis round trip for clients that send multiple requests in
+/// quick succession, entries are only kept for a short while so sessions
+/// removed by other instances don't linger. An entry never outlives the
+/// session it was cached for.
+#[derive(Clone, Debug, Default)]
+pub struct SessionCache {
+	entries: Arc<Mutex<HashMap<i32, (SessionData, Instant)>>>,
+}
+
+impl SessionCache {
+	/// Maximum number of sessions kept in the cache
+	const CAPACITY: usize = 4096;
+	/// How long a session can be served from the cache before it has to be
+	/// fetched from redis again
+	const TTL: std::time::Duration = std::time::Duration::from_secs(30);
+
+	/// Get the data of a session if it was cached recently enough
+	fn get(&self, id: i32) -> Option<SessionData> {
+		let mut entries = self.entries.lock();
+
+		let (data, expires_at) = *entries.get(&id)?;
+
+		if Instant::now() >= expires_at {
+			entries.remove(&id);
+
+			return None;
+		}
+
+		Some(data)
+	}
+
+	/// Store the data of a session that expires after the given duration
+	fn insert(
+		&self,
+		id: i32,
+		data: SessionData,
+		remaining: std::time::Duration,
+	) {
+		let now = Instant::now();
+		let mut entries = self.entries.lock();
+
+		if entries.len() >= Self::CAPACITY {
+			entries.retain(|_, (_, expires_at)| now < *expires_at);
+		}
+
+		if entries.len() >= Self::CAPACITY {
+			entries.clear();
+		}
+
+		entries.insert(id, (data, now + remaining.min(Self::TTL)));
+	}
+
+	/// Remove a session from the cache
+	fn remove(&self, id: i32) { self.entries.lock().remove(&id); }
 }
 
 impl FromRequestParts<AppState> for Session {
@@ -53,30 +121,15 @@ impl FromRequestParts<AppState> for Session {
 
 	async fn from_request_parts(
 		parts: &mut Parts,
-		state: &AppState,
+		_state: &AppState,
 	) -> Result<Self, Self::Rejection> {
-		let session_id = match parts.extensions.get::<i32>() {
-			Some(id) => *id,
-			None => {
-				return Err(InternalServerError::SessionWithoutAuthError.into());
-			},
+		// The auth middleware already fetched the session, so there is no need
+		// to hit the cache again
+		let Some(session) = parts.extensions.get::<Self>() else {
+			return Err(InternalServerError::SessionWithoutAuthError.into());
 		};
 
-		let State(mut conn) = parts
-			.extract_with_state::<State<RedisConn>, AppState>(state)
-			.await
-			.map_err(|_| Error::InternalServerError)?;
-
-		let session = Self::get(session_id, &mut conn).await?;
-
-		let Some(session) = session else {
-			return Err(Error::Infallible(
-				"failed to retrieve session despite passing auth middleware"
-					.to_string(),
-			));
-		};
-
-		Ok(session)
+		Ok(*session)
 	}
 }
 
@@ -102,29 +155,73 @@ impl FromRequestParts<AppState> for AdminSession {
 
 impl Session {
 	/// Create and store a new [`Session`] for a given [`Profile`]
-	#[instrument(skip(conn))]
+	#[instrument(skip(cache, conn))]
 	pub async fn create(
 		lifetime: Duration,
 		profile: &Profile,
+		cache: &SessionCache,
+		conn: &mut RedisConn,
+	) -> Result<Self, Error> {
+		Self::store(lifetime, profile, None, cache, conn).await
+	}
+
+	/// Create and store a new [`Session`] for a [`Profile`] that logged in
+	/// with the given claims
+	#[instrument(skip(claims, cache, conn))]
+	pub async fn create_from_claims(
+		lifetime: Duration,
+		profile: &Profile,
+		claims: &str,
+		cache: &SessionCache,
+		conn: &mut RedisConn,
+	) -> Result<Self, Error> {
+		let claims_digest = Some(Self::claims_digest(claims));
+
+		Self::store(lifetime, profile, claims_digest, cache, conn).await
+	}
+
+	/// Digest of the raw login claims, used to tell whether a live session
+	/// was created from the claims sent with a request
+	///
+	/// The digest may differ between builds, which only costs one extra
+	/// exchange of the claims
+	#[must_use]
+	pub fn claims_digest(claims: &str) -> u64 {
+		let mut hasher = DefaultHasher::new();
+		claims.hash(&mut hasher);
+
+		hasher.finish()
+	}
+
+	async fn store(
+		lifetime: Duration,
+		profile: &Profile,
+		claims_digest: Option<u64>,
+		cache: &SessionCache,
 		conn: &mut RedisConn,
 	) -> Result<Self, Error> {
 		let id = profile.primitive.id;
 		let profile_id = profile.primitive.id;
 
-		let data =
-			SessionData { profile_id, is_admin: profile.primitive.is_admin };
+		let data = SessionData {
+			profile_id,
+			is_admin: profile.primitive.is_admin,
+			claims_digest,
+		};
 
 		let session = Self { id, data };
 
 		// Add a buffer of 10 seconds to ensure the cached session doesn't
 		// expire before the session cookie does
-		let expiry = lifetime.whole_seconds() + 10;
+		let expiry = lifetime.whole_seconds().unsigned_abs() + 10;
 
-		let data = serde_json::to_string(&data)
+		let data_string = serde_json::to_string(&data)
 			.map_err(InternalServerError::SerdeJsonError)?;
 
-		let _: bool = conn.set(id, &data).await?;
-		let _: bool = conn.expire(id, expiry).await?;
+		// Store the session and its expiry in a single command
+		let _: bool = conn.set_ex(id, &data_string, expiry).await?;
+
+		cache.insert(id, data, std::time::Duration::from_secs(expiry));
 
 		debug!(
 			"stored session {} in cache for profile {}",
@@ -135,39 +232,72 @@ impl Session {
 	}
 
 	/// Get a session from the cache
-	#[instrument(skip(conn))]
+	#[instrument(skip(cache, conn))]
 	pub async fn get(
 		id: i32,
+		cache: &SessionCache,
 		conn: &mut RedisConn,
 	) -> Result<Option<Self>, Error> {
-		let data_string: Option<String> = conn.get(id).await?;
+		if let Some(data) = cache.get(id) {
+			return Ok(Some(Self { id, data }));
+		}
+
+		// Fetch the remaining lifetime along with the session so the cached
+		// copy expires no later than the stored one, atomically so the key
+		// can't expire in between
+		let (data_string, ttl): (Option<String>, i64) =
+			redis::pipe().atomic().get(id).ttl(id).query_async(conn).await?;
 
 		let Some(data_string) = data_string.as_ref() else {
 			return Ok(None);
 		};
 
+		// A TTL of -2 means the key doesn't exist (anymore)
+		if ttl == -2 {
+			return Ok(None);
+		}
+
 		let data: SessionData = serde_json::from_str(data_string)
 			.map_err(InternalServerError::SerdeJsonError)?;
 
+		// A TTL of -1 means the key has no expiry
+		let remaining = if ttl == -1 {
+			SessionCache::TTL
+		} else {
+			std::time::Duration::from_secs(ttl.unsigned_abs())
+		};
+
+		cache.insert(id, data, remaining);
+
 		let session = Self { id, data };
 
 		Ok(Some(session))
 	}
 
 	/// Remove a session given its id
-	#[instrument(skip(conn))]
-	pub async fn delete(id: i32, conn: &mut RedisConn) -> Result<(), Error> {
+	#[instrument(skip(cache, conn))]
+	pub async fn delete(
+		id: i32,
+		cache: &SessionCache,
+		conn: &mut RedisConn,
+	) -> Result<(), Error> {
+		cache.remove(id);
+
 		let _: i32 = conn.del(id).await?;
 
 		Ok(())
 	}
 
-	/// Check if a session with this id exists
-	#[instrument(skip(conn))]
-	pub async fn exists(id: i32, conn: &mut RedisConn) -> Result<bool, Error> {
-		let exists: i32 = conn.exists(id).await?;
-
-		Ok(exists == 1)
+	/// Get the id of the session in the access token cookie of a jar
+	///
+	/// The jar only decrypts the access token cookie, which is authenticated
+	/// so any value it holds was set by us
+	#[must_use]
+	pub fn id_from_jar(
+		jar: &PrivateCookieJar,
+		cookie_name: &str,
+	) -> Option<i32> {
+		jar.get(cookie_name)?.value().parse().ok()
 	}
 
 	/// Convert this [`Session`] into an access token cookie
@@ -0,0 +1,99 @@
+//! In-memory cache for [`Translation`](translation::Translation) responses
+
+use std::collections::HashMap;
+use std::sync::Arc;
+use std::time::Instant;
+
+use parking_lot::Mutex;
+
+use crate::schemas::translation::TranslationResponse;
+
+/// Cache of recently requested translations, keyed by their id
+///
+/// Only responses without included profiles are cached. Writes through the API
+/// refresh or remove the affected entry, reads never replace an entry and
+/// writes never replace a newer one, so a slow read can't bring back an old
+/// version. The TTL bounds how long writes that bypass the cache can go
+/// unnoticed.
+#[derive(Clone, Debug, Default)]
+pub struct TranslationCache {
+	entries: Arc<Mutex<HashMap<i32, (TranslationResponse, Instant)>>>,
+}
+
+impl TranslationCache {
+	/// Maximum number of translations kept in the cache
+	const CAPACITY: usize = 16384;
+	/// How long a translation can be served from the cache before it has to
+	/// be fetched from the database again
+	const TTL: std::time::Duration = std::time::Duration::from_secs(300);
+
+	/// Get a translation if it was cached recently enough
+	pub(crate) fn get(&self, id: i32) -> Option<TranslationResponse> {
+		let mut entries = self.entries.lock();
+
+		let (response, cached_at) = entries.get(&id)?;
+
+		if cached_at.elapsed() >= Self::TTL {
+			entries.remove(&id);
+
+			return None;
+		}
+
+		Some(response.clone())
+	}
+
+	/// Store a translation that was just written, an entry is only kept over it
+	/// if it is newer
+	pub(crate) fn insert(&self, id: i32, response: TranslationResponse) {
+		let mut entries = self.entries.lock();
+
+		if let Some((cached, cached_at)) = entries.get(&id)
+			&& cached_at.elapsed() < Self::TTL
+			&& cached.updated_at > response.updated_at
+		{
+			return;
+		}
+
+		Self::store(&mut entries, id, response);
+	}
+
+	/// Store a translation that was read from the database
+	///
+	/// A cached entry is kept as is, it may have been written after the read
+	/// started
+	pub(crate) fn insert_if_absent(
+		&self,
+		id: i32,
+		response: TranslationResponse,
+	) {
+		let mut entries = self.entries.lock();
+
+		if let Some((_, cached_at)) = entries.get(&id)
+			&& cached_at.elapsed() < Self::TTL
+		{
+			return;
+		}
+
+		Self::store(&mut entries, id, response);
+	}
+
+	/// Store a translation, making room for it if the cache is full
+	fn store(
+		entries: &mut HashMap<i32, (TranslationResponse, Instant)>,
+		id: i32,
+		response: TranslationResponse,
+	) {
+		if entries.len() >= Self::CAPACITY {
+			entries.retain(|_, (_, cached_at)| cached_at.elapsed() < Self::TTL);
+		}
+
+		if entries.len() >= Self::CAPACITY {
+			entries.clear();
+		}
+
+		entries.insert(id, (response, Instant::now()));
+	}
+
+	/// Remove a translation from the cache
+	pub(crate) fn remove(&self, id: i32) { self.entries.lock().remove(&id); }
+}
@@ -1,4 +1,10 @@
-use axum::http::StatusCode;
+use argon2::password_hash::rand_core::OsRng;
+use argon2::password_hash::{PasswordHash, SaltString};
+use argon2::{Algorithm, Argon2, Params, PasswordHasher, Version};
+use axum::http::{StatusCode, header};
+use axum::response::IntoResponse;
+use axum_extra::extract::PrivateCookieJar;
+use axum_extra::extract::cookie::{Cookie, Key};
 use blokmap::schemas::auth::{
 	LoginRequest,
 	PasswordResetData,
@@ -6,6 +12,7 @@ use blokmap::schemas::auth::{
 	RegisterRequest,
 };
 use primitives::PrimitiveProfile;
+use profile::ProfileClaims;
 
 mod common;
 
@@ -13,22 +20,129 @@ use blokmap::schemas::profile::ProfileResponse;
 use chrono::Utc;
 use common::TestEnv;
 
+/// Registration data for the user the auth tests sign up as
+fn bob() -> RegisterRequest {
+	RegisterRequest {
+		username:   "bob".to_string(),
+		password:   "bobdebouwer1234!".to_string(),
+		email:      "bob@example.com".to_string(),
+		first_name: "Bob".to_string(),
+		last_name:  "De Bouwer".to_string(),
+	}
+}
+
+/// Register [`bob`] and wait for the confirmation email
+async fn register_bob(env: &TestEnv) {
+	env.expect_mail_to(&["bob@example.com"], async || {
+		env.app.post("/auth/register").json(&bob()).await;
+	})
+	.await;
+}
+
+/// Build the encrypted login claims cookie an SSO login would leave behind
+fn claims_cookie(email: &str) -> Cookie<'static> {
+	let claims = ProfileClaims {
+		issuer:     "test".to_string(),
+		email:      email.to_string(),
+		username:   None,
+		first_name: None,
+		last_name:  None,
+		avatar_url: None,
+	};
+
+	let cookie = Cookie::new(
+		"blokmap_login_claims",
+		serde_json::to_string(&claims).unwrap(),
+	);
+
+	// The jar encrypts its cookies with the test key when written out
+	let response = PrivateCookieJar::new(Key::from(&[0u8; 64]))
+		.add(cookie)
+		.into_response();
+
+	let set_cookie = response.headers()[header::SET_COOKIE].to_str().unwrap();
+
+	Cookie::parse(set_cookie.to_string()).unwrap()
+}
+
+/// Password hashing parameters the server is configured with, read the same
+/// way as the profile model does
+fn configured_hash_params() -> (u32, u32, u32) {
+	let param = |var: &str, default: u32| {
+		std::env::var(var).map_or(default, |v| v.parse().unwrap())
+	};
+
+	(
+		param("PASSWORD_HASH_MEMORY_KIB", 19 * 1024),
+		param("PASSWORD_HASH_ITERATIONS", 2),
+		param("PASSWORD_HASH_PARALLELISM", 1),
+	)
+}
+
+/// Hash "foo" with the given Argon2id parameters
+fn hash_foo(params: Params) -> String {
+	let salt = SaltString::generate(&mut OsRng);
+
+	Argon2::new(Algorithm::Argon2id, Version::V0x13, params)
+		.hash_password(b"foo", &salt)
+		.unwrap()
+		.to_string()
+}
+
+/// Store a password hash for the "test" profile
+async fn set_test_password_hash(env: &TestEnv, hash: String) {
+	let conn = env.db_guard.pool().get().await.unwrap();
+
+	conn.interact(move |conn| {
+		use db::profile::dsl::*;
+		use diesel::prelude::*;
+
+		diesel::update(profile.filter(username.eq("test")))
+			.set(password_hash.eq(hash))
+			.execute(conn)
+	})
+	.await
+	.unwrap()
+	.unwrap();
+}
+
+/// Log in as the "test" profile and return its stored password hash
+async fn login_test_password_hash(env: &TestEnv) -> String {
+	let response = env
+		.app
+		.post("/auth/login")
+		.json(&LoginRequest {
+			username: "test".to_string(),
+			password: "foo".to_string(),
+			remember: false,
+		})
+		.await;
+
+	assert_eq!(response.status_code(), StatusCode::NO_CONTENT);
+
+	let conn = env.db_guard.pool().get().await.unwrap();
+
+	conn.interact(|conn| {
+		use db::profile::dsl::*;
+		use diesel::prelude::*;
+
+		profile
+			.select(password_hash)
+			.filter(username.eq("test"))
+			.get_result(conn)
+	})
+	.await
+	.unwrap()
+	.unwrap()
+}
+
 #[tokio::test(flavor = "multi_thread")]
 async fn register() {
 	let env = TestEnv::new().await;
 
 	let response = env
 		.expect_mail_to(&["bob@example.com"], async || {
-			env.app
-				.post("/auth/register")
-				.json(&RegisterRequest {
-					username:   "bob".to_string(),
-					password:   "bobdebouwer1234!".to_string(),
-					email:      "bob@example.com".to_string(),
-					first_name: "Bob".to_string(),
-					last_name:  "De Bouwer".to_string(),
-				})
-				.await
+			env.app.post("/auth/register").json(&bob()).await
 		})
 		.await;
 
@@ -49,13 +163,7 @@ async fn register_invalid_username_start() {
 		.expect_no_mail(async || {
 			env.app
 				.post("/auth/register")
-				.json(&RegisterRequest {
-					username:   "123".to_string(),
-					password:   "bobdebouwer1234!".to_string(),
-					email:      "bob@example.com".to_string(),
-					first_name: "Bob".to_string(),
-					last_name:  "De Bouwer".to_string(),
-				})
+				.json(&RegisterRequest { username: "123".to_string(), ..bob() })
 				.await
 		})
 		.await;
@@ -72,11 +180,8 @@ async fn register_invalid_username_symbols() {
 			env.app
 				.post("/auth/register")
 				.json(&RegisterRequest {
-					username:   "abc.".to_string(),
-					password:   "bobdebouwer1234!".to_string(),
-					email:      "bob@example.com".to_string(),
-					first_name: "Bob".to_string(),
-					last_name:  "De Bouwer".to_string(),
+					username: "abc.".to_string(),
+					..bob()
 				})
 				.await
 		})
@@ -100,13 +205,7 @@ async fn register_username_too_short() {
 		.expect_no_mail(async || {
 			env.app
 				.post("/auth/register")
-				.json(&RegisterRequest {
-					username:   "a".to_string(),
-					password:   "bobdebouwer1234!".to_string(),
-					email:      "bob@example.com".to_string(),
-					first_name: "Bob".to_string(),
-					last_name:  "De Bouwer".to_string(),
-				})
+				.json(&RegisterRequest { username: "a".to_string(), ..bob() })
 				.await
 		})
 		.await;
@@ -121,20 +220,15 @@ async fn register_username_too_short() {
 async fn register_username_too_long() {
 	let env = TestEnv::new().await;
 
+	let username = "zijne-majesteit-antonius-gregorius-albertus-III-van-brugge"
+		.to_string();
+
 	let response = env
 		.expect_no_mail(async || {
 			env.app
-			.post("/auth/register")
-			.json(&RegisterRequest {
-				username:
-					"zijne-majesteit-antonius-gregorius-albertus-III-van-brugge"
-						.to_string(),
-				password: "bobdebouwer1234!".to_string(),
-				email:    "bob@example.com".to_string(),
-					first_name: "Bob".to_string(),
-					last_name: "De Bouwer".to_string()
-			})
-			.await
+				.post("/auth/register")
+				.json(&RegisterRequest { username, ..bob() })
+				.await
 		})
 		.await;
 
@@ -152,13 +246,7 @@ async fn register_password_too_short() {
 		.expect_no_mail(async || {
 			env.app
 				.post("/auth/register")
-				.json(&RegisterRequest {
-					username:   "bob".to_string(),
-					password:   "123".to_string(),
-					email:      "bob@example.com".to_string(),
-					first_name: "Bob".to_string(),
-					last_name:  "De Bouwer".to_string(),
-				})
+				.json(&RegisterRequest { password: "123".to_string(), ..bob() })
 				.await
 		})
 		.await;
@@ -177,13 +265,7 @@ async fn register_invalid_email() {
 		.expect_no_mail(async || {
 			env.app
 				.post("/auth/register")
-				.json(&RegisterRequest {
-					username:   "bob".to_string(),
-					password:   "bobdebouwer1234!".to_string(),
-					email:      "appel".to_string(),
-					first_name: "Bob".to_string(),
-					last_name:  "De Bouwer".to_string(),
-				})
+				.json(&RegisterRequest { email: "appel".to_string(), ..bob() })
 				.await
 		})
 		.await;
@@ -198,30 +280,15 @@ async fn register_invalid_email() {
 async fn register_duplicate_email() {
 	let env = TestEnv::new().await;
 
-	env.expect_mail_to(&["bob@example.com"], async || {
-		env.app
-			.post("/auth/register")
-			.json(&RegisterRequest {
-				username:   "bob".to_string(),
-				password:   "bobdebouwer1234!".to_string(),
-				email:      "bob@example.com".to_string(),
-				first_name: "Bob".to_string(),
-				last_name:  "De Bouwer".to_string(),
-			})
-			.await
-	})
-	.await;
+	register_bob(&env).await;
 
 	let response = env
 		.expect_no_mail(async || {
 			env.app
 				.post("/auth/register")
 				.json(&RegisterRequest {
-					username:   "bob2".to_string(),
-					password:   "bobdebouwer1234!".to_string(),
-					email:      "bob@example.com".to_string(),
-					first_name: "Bob".to_string(),
-					last_name:  "De Bouwer".to_string(),
+					username: "bob2".to_string(),
+					..bob()
 				})
 				.await
 		})
@@ -242,11 +309,10 @@ async fn register_duplicate_username() {
 			env.app
 				.post("/auth/register")
 				.json(&RegisterRequest {
-					username:   "test".to_string(),
-					password:   "fooikhebeenlangerwachtwoordnodig".to_string(),
-					email:      "test2@example.com".to_string(),
-					first_name: "Bob".to_string(),
-					last_name:  "De Bouwer".to_string(),
+					username: "test".to_string(),
+					password: "fooikhebeenlangerwachtwoordnodig".to_string(),
+					email: "test2@example.com".to_string(),
+					..bob()
 				})
 				.await
 		})
@@ -264,21 +330,9 @@ async fn register_duplicate_username() {
 async fn confirm_email() {
 	let env = TestEnv::new().await;
 
-	env.expect_mail_to(&["bob@example.com"], async || {
-		env.app
-			.post("/auth/register")
-			.json(&RegisterRequest {
-				username:   "bob".to_string(),
-				password:   "bobdebouwer1234!".to_string(),
-				email:      "bob@example.com".to_string(),
-				first_name: "Bob".to_string(),
-				last_name:  "De Bouwer".to_string(),
-			})
-			.await;
-	})
-	.await;
+	register_bob(&env).await;
 
-	let conn = env.db_guard.create_pool().get().await.unwrap();
+	let conn = env.db_guard.pool().get().await.unwrap();
 	let email_confirmation_token: Option<String> = conn
 		.interact(|conn| {
 			use db::profile::dsl::*;
@@ -322,21 +376,9 @@ async fn confirm_email() {
 async fn confirm_email_expired_token() {
 	let env = TestEnv::new().await;
 
-	env.expect_mail_to(&["bob@example.com"], async || {
-		env.app
-			.post("/auth/register")
-			.json(&RegisterRequest {
-				username:   "bob".to_string(),
-				password:   "bobdebouwer1234!".to_string(),
-				email:      "bob@example.com".to_string(),
-				first_name: "Bob".to_string(),
-				last_name:  "De Bouwer".to_string(),
-			})
-			.await;
-	})
-	.await;
+	register_bob(&env).await;
 
-	let conn = env.db_guard.create_pool().get().await.unwrap();
+	let conn = env.db_guard.pool().get().await.unwrap();
 	let profile: PrimitiveProfile = conn
 		.interact(|conn| {
 			use db::profile::dsl::*;
@@ -380,21 +422,9 @@ async fn confirm_email_expired_token() {
 async fn resend_confirmation_email() {
 	let env = TestEnv::new().await;
 
-	env.expect_mail_to(&["bob@example.com"], async || {
-		env.app
-			.post("/auth/register")
-			.json(&RegisterRequest {
-				username:   "bob".to_string(),
-				password:   "bobdebouwer1234!".to_string(),
-				email:      "bob@example.com".to_string(),
-				first_name: "Bob".to_string(),
-				last_name:  "De Bouwer".to_string(),
-			})
-			.await;
-	})
-	.await;
+	register_bob(&env).await;
 
-	let conn = env.db_guard.create_pool().get().await.unwrap();
+	let conn = env.db_guard.pool().get().await.unwrap();
 	let old_profile: PrimitiveProfile = conn
 		.interact(|conn| {
 			use db::profile::dsl::*;
@@ -417,13 +447,7 @@ async fn resend_confirmation_email() {
 				"/auth/resend_confirmation_email/{}",
 				old_profile.id
 			))
-			.json(&RegisterRequest {
-				username:   "bob".to_string(),
-				password:   "bobdebouwer1234!".to_string(),
-				email:      "bob@example.com".to_string(),
-				first_name: "Bob".to_string(),
-				last_name:  "De Bouwer".to_string(),
-			})
+			.json(&bob())
 			.await;
 	})
 	.await;
@@ -480,7 +504,7 @@ async fn reset_password() {
 
 	assert_eq!(response.status_code(), StatusCode::NO_CONTENT);
 
-	let conn = env.db_guard.create_pool().get().await.unwrap();
+	let conn = env.db_guard.pool().get().await.unwrap();
 	let password_reset_token: Option<String> = conn
 		.interact(|conn| {
 			use db::profile::dsl::*;
@@ -541,7 +565,7 @@ async fn reset_password_expired_token() {
 
 	assert_eq!(response.status_code(), StatusCode::NO_CONTENT);
 
-	let conn = env.db_guard.create_pool().get().await.unwrap();
+	let conn = env.db_guard.pool().get().await.unwrap();
 	let profile: PrimitiveProfile = conn
 		.interact(|conn| {
 			use db::profile::dsl::*;
@@ -601,6 +625,44 @@ async fn login_username() {
 	assert_eq!(response.status_code(), StatusCode::NO_CONTENT);
 }
 
+#[tokio::test(flavor = "multi_thread")]
+async fn login_keeps_stronger_password_hash() {
+	let env = TestEnv::new().await;
+
+	let (m_cost, t_cost, p_cost) = configured_hash_params();
+	let params = Params::new(m_cost * 2, t_cost + 1, p_cost, None).unwrap();
+
+	let strong_hash = hash_foo(params);
+	set_test_password_hash(&env, strong_hash.clone()).await;
+
+	let stored_hash = login_test_password_hash(&env).await;
+
+	assert_eq!(stored_hash, strong_hash);
+}
+
+#[tokio::test(flavor = "multi_thread")]
+async fn login_rehashes_weaker_password_hash() {
+	let env = TestEnv::new().await;
+
+	let (m_cost, t_cost, p_cost) = configured_hash_params();
+	let params = Params::new(m_cost / 2, t_cost, p_cost, None)
+		.expect("configured memory cost leaves no room for a weaker hash");
+
+	let weak_hash = hash_foo(params);
+	set_test_password_hash(&env, weak_hash.clone()).await;
+
+	let stored_hash = login_test_password_hash(&env).await;
+
+	assert_ne!(stored_hash, weak_hash);
+
+	let stored_hash = PasswordHash::new(&stored_hash).unwrap();
+	let stored_params = Params::try_from(&stored_hash).unwrap();
+
+	assert_eq!(stored_params.m_cost(), m_cost);
+	assert_eq!(stored_params.t_cost(), t_cost);
+	assert_eq!(stored_params.p_cost(), p_cost);
+}
+
 #[tokio::test(flavor = "multi_thread")]
 async fn login_username_disabled() {
 	let env = TestEnv::new().await;
@@ -683,3 +745,63 @@ async fn logout() {
 	assert_eq!(access_token.max_age(), Some(time::Duration::ZERO));
 	assert_eq!(response.status_code(), StatusCode::NO_CONTENT);
 }
+
+#[tokio::test(flavor = "multi_thread")]
+async fn claims_exchanged_without_session() {
+	let env = TestEnv::new().await;
+
+	let response = env
+		.app
+		.get("/profiles/1/stats")
+		.add_cookie(claims_cookie("test@example.com"))
+		.await;
+
+	let _access_token = response.cookie("blokmap_access_token");
+
+	assert_eq!(response.status_code(), StatusCode::OK);
+}
+
+#[tokio::test(flavor = "multi_thread")]
+async fn claims_not_exchanged_twice() {
+	let env = TestEnv::new().await;
+
+	let response = env
+		.app
+		.get("/profiles/1/stats")
+		.add_cookie(claims_cookie("test@example.com"))
+		.await;
+
+	let _access_token = response.cookie("blokmap_access_token");
+
+	let response = env
+		.app
+		.get("/profiles/1/stats")
+		.add_cookie(claims_cookie("test@example.com"))
+		.await;
+
+	// The live session was created from these claims, so it is reused
+	assert!(response.maybe_cookie("blokmap_access_token").is_none());
+
+	assert_eq!(response.status_code(), StatusCode::OK);
+}
+
+#[tokio::test(flavor = "multi_thread")]
+async fn claims_switch_account_with_valid_session() {
+	let env = TestEnv::new().await.login("test").await;
+
+	let response = env
+		.app
+		.post("/tags")
+		.add_cookie(claims_cookie("test-admin@example.com"))
+		.json(&serde_json::json!({
+			"name": {
+				"nl": "Veel Plaats",
+			},
+		}))
+		.await;
+
+	// The claims belong to another profile, so they replace the session
+	let _access_token = response.cookie("blokmap_access_token");
+
+	assert_eq!(response.status_code(), StatusCode::CREATED);
+}
@@ -1,4 +1,4 @@
-use std::sync::LazyLock;
+use std::sync::{Arc, LazyLock, Weak};
 
 use common::{DbConn, DbPool};
 use deadpool_diesel::postgres::{Manager, Pool};
@@ -7,6 +7,7 @@ use diesel_migrations::{
 	MigrationHarness,
 	embed_migrations,
 };
+use tokio::sync::Mutex;
 use uuid::Uuid;
 
 const MIGRATIONS: EmbeddedMigrations = embed_migrations!("./migrations");
@@ -19,13 +20,25 @@ pub static DATABASE_PROVIDER: LazyLock<DatabaseProvider> =
 pub struct DatabaseProvider {
 	base_url:  String,
 	root_pool: DbPool,
+	template:  Mutex<Weak<TemplateGuard>>,
+}
+
+/// A RAII guard for the seeded database every test database is copied from
+///
+/// The name is unique per test process so concurrent runs against the same
+/// server never drop each other's template
+struct TemplateGuard {
+	root_conn:     DbConn,
+	database_name: String,
 }
 
 /// A test database RAII guard
 pub struct DatabaseGuard {
 	root_conn:     DbConn,
 	database_name: String,
-	database_url:  String,
+	pool:          DbPool,
+	// Keeps the template alive until this copy has been dropped
+	_template:     Arc<TemplateGuard>,
 }
 
 impl DatabaseProvider {
@@ -49,7 +62,66 @@ impl DatabaseProvider {
 
 		let root_pool = Pool::builder(manager).build().unwrap();
 
-		Self { base_url, root_pool }
+		Self { base_url, root_pool, template: Mutex::new(Weak::new()) }
+	}
+
+	/// Get the current template database, creating it if no live
+	/// [`DatabaseGuard`] holds one
+	async fn template(&self) -> Arc<TemplateGuard> {
+		let mut template = self.template.lock().await;
+
+		if let Some(guard) = template.upgrade() {
+			return guard;
+		}
+
+		let guard = Arc::new(self.prepare_template().await);
+		*template = Arc::downgrade(&guard);
+
+		guard
+	}
+
+	/// Create, migrate and seed a new template database
+	async fn prepare_template(&self) -> TemplateGuard {
+		let uuid = Uuid::new_v4().simple().to_string();
+		let database_name = format!("test_template_{uuid}");
+
+		let root_conn = self
+			.root_pool
+			.get()
+			.await
+			.expect("could not get root pool connection");
+
+		let create_template_query = format!("CREATE DATABASE {database_name};");
+
+		root_conn
+			.interact(|conn| {
+				use diesel::prelude::*;
+
+				diesel::sql_query(create_template_query).execute(conn)
+			})
+			.await
+			.expect("could not interact with root connection")
+			.expect("could not create template database");
+
+		let template_url = format!("{}/{}", self.base_url, database_name);
+		let manager =
+			Manager::new(template_url, deadpool_diesel::Runtime::Tokio1);
+
+		// The pool is dropped when this returns, a database can only be used as
+		// a template while nobody is connected to it
+		let pool = Pool::builder(manager).max_size(1).build().unwrap();
+
+		let conn = pool.get().await.unwrap();
+		conn.interact(|conn| {
+			conn.run_pending_migrations(MIGRATIONS).map(|_| ())
+		})
+		.await
+		.unwrap()
+		.unwrap();
+
+		super::seed_database(&conn).await;
+
+		TemplateGuard { root_conn, database_name }
 	}
 
 	/// Acquire a new [`DatabaseGuard`] for accessing a temporary test database
@@ -57,6 +129,8 @@ impl DatabaseProvider {
 	/// # Panics
 	/// Panics if creating a database fails
 	pub(crate) async fn acquire(&self) -> DatabaseGuard {
+		let template = self.template().await;
+
 		let uuid = Uuid::new_v4().simple().to_string();
 		let database_name = format!("test_{uuid}");
 		let database_url = format!("{}/{}", self.base_url, database_name);
@@ -67,7 +141,10 @@ impl DatabaseProvider {
 			.await
 			.expect("could not get root pool connection");
 
-		let create_db_query = format!("CREATE DATABASE {database_name};");
+		let create_db_query = format!(
+			"CREATE DATABASE {database_name} TEMPLATE {};",
+			template.database_name
+		);
 
 		root_conn
 			.interact(|conn| {
@@ -79,39 +156,43 @@ impl DatabaseProvider {
 			.expect("could not interact with root connection")
 			.expect("could not create test database");
 
-		DatabaseGuard { root_conn, database_name, database_url }
+		// The copy is already migrated and seeded, every user of this guard
+		// shares the pool
+		let manager =
+			Manager::new(database_url, deadpool_diesel::Runtime::Tokio1);
+
+		let pool = Pool::builder(manager).build().unwrap();
+
+		DatabaseGuard { root_conn, database_name, pool, _template: template }
 	}
 }
 
 impl DatabaseGuard {
-	/// Create a new database pool for this test database guard
-	///
-	/// # Panics
-	/// Panics if creation fails
+	/// Get the database pool for this test database guard
 	#[must_use]
-	pub fn create_pool(&self) -> DbPool {
-		let manager = Manager::new(
-			self.database_url.clone(),
-			deadpool_diesel::Runtime::Tokio1,
-		);
+	pub fn pool(&self) -> DbPool { self.pool.clone() }
+}
 
-		let pool = Pool::builder(manager).build().unwrap();
+impl Drop for DatabaseGuard {
+	fn drop(&mut self) {
+		let drop_db_query =
+			format!("DROP DATABASE {} WITH (FORCE);", self.database_name);
 
-		futures::executor::block_on(async {
-			let conn = pool.get().await.unwrap();
-			conn.interact(|conn| {
-				conn.run_pending_migrations(MIGRATIONS).map(|_| ())
-			})
-			.await
-			.unwrap()
-			.unwrap();
-		});
+		futures::executor::block_on(async move {
+			self.root_conn
+				.interact(|conn| {
+					use diesel::prelude::*;
 
-		pool
+					diesel::sql_query(drop_db_query).execute(conn)
+				})
+				.await
+				.expect("could not interact with root connection")
+				.expect("could not drop test database");
+		});
 	}
 }
 
-impl Drop for DatabaseGuard {
+impl Drop for TemplateGuard {
 	fn drop(&mut self) {
 		let drop_db_query =
 			format!("DROP DATABASE {} WITH (FORCE);", self.database_name);
@@ -125,7 +206,7 @@ impl Drop for DatabaseGuard {
 				})
 				.await
 				.expect("could not interact with root connection")
-				.expect("could not drop test database");
+				.expect("could not drop template database");
 		});
 	}
 }
@@ -4,8 +4,16 @@ use axum_extra::extract::cookie::Key;
 use axum_test::TestServer;
 use blokmap::mailer::{Mailer, StubMailbox};
 use blokmap::schemas::auth::LoginRequest;
-use blokmap::{AppState, Config, SeedProfile, Seeder, routes};
-use common::Error;
+use blokmap::{
+	AppState,
+	Config,
+	SeedProfile,
+	Seeder,
+	SessionCache,
+	TranslationCache,
+	routes,
+};
+use common::{DbConn, Error};
 use location::{Location, LocationIncludes, NewLocation};
 use mock_redis::{RedisUrlGuard, RedisUrlProvider};
 use opening_time::{NewOpeningTime, OpeningTime, OpeningTimeIncludes};
@@ -21,6 +29,126 @@ mod wrap_mail;
 
 use mock_db::{DATABASE_PROVIDER, DatabaseGuard};
 
+/// Populate a freshly migrated database with the seed files
+///
+/// # Panics
+/// Panics if reading a seed file or inserting its records fails
+#[allow(clippy::too_many_lines)]
+async fn seed_database(conn: &DbConn) {
+	use diesel::prelude::*;
+
+	let seeder = Seeder::new(conn);
+
+	tracing::info!("seeding database...");
+
+	// Seed profiles
+	seeder
+		.populate(
+			"tests/seed/profiles.json",
+			async |conn, records: Vec<SeedProfile>| {
+				conn.interact(move |conn| {
+					use db::profile::dsl::*;
+
+					diesel::insert_into(profile).values(records).execute(conn)
+				})
+				.await
+				.unwrap()
+				.unwrap();
+
+				Ok(())
+			},
+		)
+		.await;
+
+	// Seed translations
+	seeder
+		.populate(
+			"tests/seed/translations.json",
+			async |conn, records: Vec<NewTranslation>| {
+				conn.interact(move |conn| {
+					use db::translation::dsl::*;
+
+					diesel::insert_into(translation)
+						.values(records)
+						.execute(conn)
+				})
+				.await
+				.unwrap()
+				.unwrap();
+
+				Ok(())
+			},
+		)
+		.await;
+
+	// Seed locations
+	seeder
+		.populate(
+			"tests/seed/locations.json",
+			async |conn, locations: Vec<NewLocation>| {
+				for location in locations {
+					location.insert(LocationIncludes::default(), conn).await?;
+				}
+
+				Ok(())
+			},
+		)
+		.await;
+
+	// Seed opening times
+	seeder
+		.populate(
+			"tests/seed/opening-times.json",
+			async |conn, records: Vec<NewOpeningTime>| {
+				conn.interact(move |conn| {
+					use db::opening_time::dsl::*;
+
+					diesel::insert_into(opening_time)
+						.values(records)
+						.execute(conn)
+				})
+				.await
+				.unwrap()
+				.unwrap();
+
+				Ok(())
+			},
+		)
+		.await;
+
+	// Seed tags
+	seeder
+		.populate("tests/seed/tags.json", async |conn, tags: Vec<NewTag>| {
+			for tag in tags {
+				tag.insert(TagIncludes::default(), conn).await?;
+			}
+
+			Ok(())
+		})
+		.await;
+
+	// Seed reservations
+	seeder
+		.populate(
+			"tests/seed/reservations.json",
+			async |conn, records: Vec<NewReservation>| {
+				conn.interact(move |conn| {
+					use db::reservation::dsl::*;
+
+					diesel::insert_into(reservation)
+						.values(records)
+						.execute(conn)
+				})
+				.await
+				.unwrap()
+				.unwrap();
+
+				Ok(())
+			},
+		)
+		.await;
+}
+
 #[allow(dead_code)]
 pub struct TestEnv {
 	pub app:          TestServer,
@@ -34,7 +162,6 @@ impl TestEnv {
 	///
 	/// # Panics
 	/// Panics if building a test server or mailbox fails
-	#[allow(clippy::too_many_lines)]
 	pub async fn new() -> Self {
 		// Load the configuration from the environment
 		let mut config = Config::from_env();
@@ -46,131 +173,7 @@ impl TestEnv {
 		tracing::info!("acquiring db guard");
 		let test_pool_guard = (*DATABASE_PROVIDER).acquire().await;
 		tracing::info!("db guard acquired");
-		let test_pool = test_pool_guard.create_pool();
-
-		// Run the seeders to populate the test database
-		{
-			use diesel::prelude::*;
-
-			let conn = test_pool.get().await.unwrap();
-			let seeder = Seeder::new(&conn);
-
-			tracing::info!("seeding database...");
-
-			// Seed profiles
-			seeder
-				.populate(
-					"tests/seed/profiles.json",
-					async |conn, records: Vec<SeedProfile>| {
-						conn.interact(move |conn| {
-							use db::profile::dsl::*;
-
-							diesel::insert_into(profile)
-								.values(records)
-								.execute(conn)
-						})
-						.await
-						.unwrap()
-						.unwrap();
-
-						Ok(())
-					},
-				)
-				.await;
-
-			// Seed translations
-			seeder
-				.populate(
-					"tests/seed/translations.json",
-					async |conn, records: Vec<NewTranslation>| {
-						conn.interact(move |conn| {
-							use db::translation::dsl::*;
-
-							diesel::insert_into(translation)
-								.values(records)
-								.execute(conn)
-						})
-						.await
-						.unwrap()
-						.unwrap();
-
-						Ok(())
-					},
-				)
-				.await;
-
-			// Seed locations
-			seeder
-				.populate(
-					"tests/seed/locations.json",
-					async |conn, locations: Vec<NewLocation>| {
-						for location in locations {
-							location
-								.insert(LocationIncludes::default(), conn)
-								.await?;
-						}
-
-						Ok(())
-					},
-				)
-				.await;
-
-			// Seed opening times
-			seeder
-				.populate(
-					"tests/seed/opening-times.json",
-					async |conn, records: Vec<NewOpeningTime>| {
-						conn.interact(move |conn| {
-							use db::opening_time::dsl::*;
-
-							diesel::insert_into(opening_time)
-								.values(records)
-								.execute(conn)
-						})
-						.await
-						.unwrap()
-						.unwrap();
-
-						Ok(())
-					},
-				)
-				.await;
-
-			// Seed tags
-			seeder
-				.populate(
-					"tests/seed/tags.json",
-					async |conn, tags: Vec<NewTag>| {
-						for tag in tags {
-							tag.insert(TagIncludes::default(), conn).await?;
-						}
-
-						Ok(())
-					},
-				)
-				.await;
-
-			// Seed reservations
-			seeder
-				.populate(
-					"tests/seed/reservations.json",
-					async |conn, records: Vec<NewReservation>| {
-						conn.interact(move |conn| {
-							use db::reservation::dsl::*;
-
-							diesel::insert_into(reservation)
-								.values(records)
-								.execute(conn)
-						})
-						.await
-						.unwrap()
-						.unwrap();
-
-						Ok(())
-					},
-				)
-				.await;
-		}
+		let test_pool = test_pool_guard.pool();
 
 		// Create a test Redis connection
 		let redis_url_guard = RedisUrlProvider::acquire();
@@ -192,10 +195,17 @@ impl TestEnv {
 			redis_connection,
 			cookie_jar_key,
 			mailer,
+			session_cache: SessionCache::default(),
+			translation_cache: TranslationCache::default(),
 		});
 
-		let test_server =
-			TestServer::builder().save_cookies().build(app).unwrap();
+		// Requests are handed to the router directly, no socket or HTTP server
+		// is involved
+		let test_server = TestServer::builder()
+			.mock_transport()
+			.save_cookies()
+			.build(app)
+			.unwrap();
 
 		TestEnv {
 			app:          test_server,
@@ -234,7 +244,7 @@ impl TestEnv {
 		&self,
 		username: &str,
 	) -> Result<PrimitiveProfile, Error> {
-		let conn = self.db_guard.create_pool().get().await.unwrap();
+		let conn = self.db_guard.pool().get().await.unwrap();
 		let profile =
 			Profile::get_by_username(username.to_string(), &conn).await?;
 		Ok(profile.primitive)
@@ -243,7 +253,7 @@ impl TestEnv {
 	/// Get a test admin profile from the test database
 	#[allow(dead_code)]
 	pub async fn get_admin_profile(&self) -> Result<PrimitiveProfile, Error> {
-		let conn = self.db_guard.create_pool().get().await.unwrap();
+		let conn = self.db_guard.pool().get().await.unwrap();
 		let profile =
 			Profile::get_by_username("test-admin".to_string(), &conn).await?;
 		Ok(profile.primitive)
@@ -252,14 +262,14 @@ impl TestEnv {
 	/// Get a test translation in the test database
 	#[allow(dead_code)]
 	pub async fn get_translation(&self) -> Result<Translation, Error> {
-		let conn = self.db_guard.create_pool().get().await.unwrap();
+		let conn = self.db_guard.pool().get().await.unwrap();
 		Translation::get_by_id(1, TranslationIncludes::default(), &conn).await
 	}
 
 	/// Get a location from the test database
 	#[allow(dead_code)]
 	pub async fn get_location(&self) -> Result<Location, Error> {
-		let conn = self.db_guard.create_pool().get().await.unwrap();
+		let conn = self.db_guard.pool().get().await.unwrap();
 		let (location, ..) =
 			Location::get_by_id(1, LocationIncludes::default(), &conn).await?;
 		Ok(location)
@@ -268,7 +278,7 @@ impl TestEnv {
 	/// Get an opening time from the test database
 	#[allow(dead_code)]
 	pub async fn get_opening_time(&self) -> Result<OpeningTime, Error> {
-		let conn = self.db_guard.create_pool().get().await.unwrap();
+		let conn = self.db_guard.pool().get().await.unwrap();
 		OpeningTime::get_by_id(1, OpeningTimeIncludes::default(), &conn).await
 	}
 }
@@ -83,6 +83,27 @@ async fn get_locations_test() {
 	assert!(locations.data.iter().any(|l| l.name == location.primitive.name));
 }
 
+#[tokio::test(flavor = "multi_thread")]
+async fn search_locations_mixed_case_language_test() {
+	let env = TestEnv::new().await;
+
+	// A language that fails to parse drops the whole query filter, which
+	// would return every visible location instead of none
+	for language in ["nl", "NL", "Nl", "En"] {
+		let response = env
+			.app
+			.get("/locations")
+			.add_query_params([("language", language), ("query", "zzqqxxjj")])
+			.await;
+
+		assert_eq!(response.status_code(), StatusCode::OK);
+
+		let locations =
+			response.json::<PaginatedResponse<Vec<LocationResponse>>>();
+		assert!(locations.data.is_empty(), "{language}");
+	}
+}
+
 #[tokio::test(flavor = "multi_thread")]
 async fn search_locations_test() {
 	let env = TestEnv::new().await;
@@ -227,3 +248,49 @@ async fn delete_location_test() {
 
 	assert_eq!(response.status_code(), StatusCode::NOT_FOUND);
 }
+
+#[tokio::test(flavor = "multi_thread")]
+async fn set_location_tags_with_duplicates_test() {
+	let env = TestEnv::new().await.login("test").await;
+
+	let response = env
+		.app
+		.post("/locations/1/tags")
+		.json(&serde_json::json!({ "tags": [1, 2, 1] }))
+		.await;
+
+	assert_eq!(response.status_code(), StatusCode::NO_CONTENT);
+
+	// The repeated tag is only linked once
+	let response = env.app.get("/locations/1").await;
+
+	assert_eq!(response.status_code(), StatusCode::OK);
+
+	let body = response.json::<serde_json::Value>();
+	let mut tag_ids: Vec<i64> = body["tags"]
+		.as_array()
+		.unwrap()
+		.iter()
+		.map(|t| t["id"].as_i64().unwrap())
+		.collect();
+
+	tag_ids.sort_unstable();
+
+	assert_eq!(tag_ids, vec![1, 2]);
+}
+
+#[tokio::test(flavor = "multi_thread")]
+async fn add_duplicate_location_member_test() {
+	let env = TestEnv::new().await.login("test").await;
+
+	let request = serde_json::json!({ "profileId": 2 });
+
+	let response = env.app.post("/locations/1/members").json(&request).await;
+
+	assert_eq!(response.status_code(), StatusCode::CREATED);
+
+	// Adding the same profile again is a conflict
+	let response = env.app.post("/locations/1/members").json(&request).await;
+
+	assert_eq!(response.status_code(), StatusCode::CONFLICT);
+}
@@ -77,7 +77,7 @@ async fn update_current_profile_username() {
 async fn update_current_profile_pending_email() {
 	let env = TestEnv::new().await.login("test").await;
 
-	let conn = env.db_guard.create_pool().get().await.unwrap();
+	let conn = env.db_guard.pool().get().await.unwrap();
 	let old_profile: PrimitiveProfile = conn
 		.interact(|conn| {
 			use db::profile::dsl::*;
@@ -137,7 +137,7 @@ async fn disable_profile() {
 
 	assert_eq!(response.status_code(), StatusCode::NO_CONTENT);
 
-	let pool = env.db_guard.create_pool();
+	let pool = env.db_guard.pool();
 	let conn = pool.get().await.unwrap();
 	let bob = Profile::get(test_id, &conn).await.unwrap();
 
@@ -162,7 +162,7 @@ async fn disable_profile_not_admin() {
 
 	assert_eq!(response.status_code(), StatusCode::FORBIDDEN);
 
-	let pool = env.db_guard.create_pool();
+	let pool = env.db_guard.pool();
 	let conn = pool.get().await.unwrap();
 	let bob = Profile::get(test_id, &conn).await.unwrap();
 
@@ -173,7 +173,7 @@ async fn disable_profile_not_admin() {
 async fn activate_profile() {
 	let env = TestEnv::new().await.login_admin().await;
 
-	let pool = env.db_guard.create_pool();
+	let pool = env.db_guard.pool();
 	let conn = pool.get().await.unwrap();
 	let pagination = PaginationOptions::default();
 	let test = Profile::get_all(pagination.into(), &conn)
@@ -199,7 +199,7 @@ async fn activate_profile() {
 async fn activate_profile_not_admin() {
 	let env = TestEnv::new().await.login("test").await;
 
-	let pool = env.db_guard.create_pool();
+	let pool = env.db_guard.pool();
 	let conn = pool.get().await.unwrap();
 	let pagination = PaginationOptions::default();
 	let test = Profile::get_all(pagination.into(), &conn)
@@ -216,7 +216,7 @@ async fn activate_profile_not_admin() {
 
 	assert_eq!(response.status_code(), StatusCode::FORBIDDEN);
 
-	let pool = env.db_guard.create_pool();
+	let pool = env.db_guard.pool();
 	let conn = pool.get().await.unwrap();
 	let bob = Profile::get(test_id, &conn).await.unwrap();
 
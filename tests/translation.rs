@@ -9,19 +9,22 @@ mod common;
 
 use common::TestEnv;
 
-#[tokio::test(flavor = "multi_thread")]
-async fn create_translation_test() {
-	let env = TestEnv::new().await.login_admin().await;
-
-	// Create a new translation.
-	let create_req = CreateTranslationRequest {
+/// Request for the translation most tests create
+fn hello() -> CreateTranslationRequest {
+	CreateTranslationRequest {
 		nl: Some("hallo".to_string()),
 		en: Some("hello".to_string()),
 		fr: Some("bonjour".to_string()),
 		de: Some("hallo".to_string()),
-	};
+	}
+}
 
-	let response = env.app.post("/translations").json(&create_req).await;
+#[tokio::test(flavor = "multi_thread")]
+async fn create_translation_test() {
+	let env = TestEnv::new().await.login_admin().await;
+
+	// Create a new translation.
+	let response = env.app.post("/translations").json(&hello()).await;
 
 	// Ensure we get a 201 CREATED response.
 	assert_eq!(response.status_code(), StatusCode::CREATED);
@@ -40,32 +43,21 @@ async fn create_translation_test() {
 async fn get_translation_test() {
 	let env = TestEnv::new().await.login_admin().await;
 
-	// First, create a translation.
-	let create_req = CreateTranslationRequest {
-		nl: Some("hallo".to_string()),
-		en: Some("hello".to_string()),
-		fr: Some("bonjour".to_string()),
-		de: Some("hallo".to_string()),
-	};
+	// Use the seeded translation instead of creating one.
+	let seeded = env.get_translation().await.unwrap().primitive;
 
-	let create_response = env.app.post("/translations").json(&create_req).await;
-
-	assert_eq!(create_response.status_code(), StatusCode::CREATED);
-	let created = create_response.json::<TranslationResponse>();
-
-	// Now, retrieve the translation using its id.
 	let get_response =
-		env.app.get(&format!("/translations/{}", created.id)).await;
+		env.app.get(&format!("/translations/{}", seeded.id)).await;
 
 	assert_eq!(get_response.status_code(), StatusCode::OK);
 	let fetched = get_response.json::<TranslationResponse>();
 
-	// Verify that the fetched translation matches the created one.
-	assert_eq!(fetched.id, created.id);
-	assert_eq!(fetched.nl, created.nl);
-	assert_eq!(fetched.en, created.en);
-	assert_eq!(fetched.fr, created.fr);
-	assert_eq!(fetched.de, created.de);
+	// Verify that the fetched translation matches the seeded one.
+	assert_eq!(fetched.id, seeded.id);
+	assert_eq!(fetched.nl, seeded.nl);
+	assert_eq!(fetched.en, seeded.en);
+	assert_eq!(fetched.fr, seeded.fr);
+	assert_eq!(fetched.de, seeded.de);
 }
 
 #[tokio::test(flavor = "multi_thread")]
@@ -73,14 +65,7 @@ async fn update_translation_test() {
 	let env = TestEnv::new().await.login_admin().await;
 
 	// Create a translation.
-	let create_req = CreateTranslationRequest {
-		nl: Some("hallo".to_string()),
-		en: Some("hello".to_string()),
-		fr: Some("bonjour".to_string()),
-		de: Some("hallo".to_string()),
-	};
-
-	let create_response = env.app.post("/translations").json(&create_req).await;
+	let create_response = env.app.post("/translations").json(&hello()).await;
 	let created = create_response.json::<TranslationResponse>();
 	assert_eq!(create_response.status_code(), StatusCode::CREATED);
 
@@ -111,30 +96,65 @@ async fn update_translation_test() {
 }
 
 #[tokio::test(flavor = "multi_thread")]
-async fn delete_translation_test() {
+async fn get_translation_after_update_test() {
 	let env = TestEnv::new().await.login_admin().await;
 
 	// Create a translation.
-	let create_req = CreateTranslationRequest {
-		nl: Some("hallo".to_string()),
-		en: Some("hello".to_string()),
-		fr: Some("bonjour".to_string()),
-		de: Some("hallo".to_string()),
-	};
-
-	let create_response = env.app.post("/translations").json(&create_req).await;
+	let create_response = env.app.post("/translations").json(&hello()).await;
 	assert_eq!(create_response.status_code(), StatusCode::CREATED);
 	let created = create_response.json::<TranslationResponse>();
+	let url = format!("/translations/{}", created.id);
+
+	// Fetch it once so it ends up in the cache.
+	let get_response = env.app.get(&url).await;
+
+	assert_eq!(get_response.status_code(), StatusCode::OK);
+
+	// Update the translation.
+	let update_req = UpdateTranslationRequest {
+		nl: None,
+		en: Some("hi".to_string()),
+		fr: None,
+		de: None,
+	};
+
+	let update_response = env.app.patch(&url).json(&update_req).await;
+
+	assert_eq!(update_response.status_code(), StatusCode::OK);
+
+	// Ensure the next fetch returns the updated translation.
+	let get_response = env.app.get(&url).await;
+
+	assert_eq!(get_response.status_code(), StatusCode::OK);
+	let fetched = get_response.json::<TranslationResponse>();
+
+	assert_eq!(fetched.en, Some("hi".to_string()));
+	assert_eq!(fetched.nl, created.nl);
+}
+
+#[tokio::test(flavor = "multi_thread")]
+async fn delete_translation_test() {
+	let env = TestEnv::new().await.login_admin().await;
 
-	// Delete the translation.
-	let delete_response =
-		env.app.delete(&format!("/translations/{}", created.id)).await;
+	// Delete the seeded translation.
+	let seeded = env.get_translation().await.unwrap().primitive;
+	let url = format!("/translations/{}", seeded.id);
+
+	let delete_response = env.app.delete(&url).await;
 
 	assert_eq!(delete_response.status_code(), StatusCode::NO_CONTENT);
 
 	// Ensure the translation was deleted by attempting to retrieve it.
-	let get_response =
-		env.app.get(&format!("/translations/{}", created.id)).await;
+	let get_response = env.app.get(&url).await;
 
 	assert_eq!(get_response.status_code(), StatusCode::NOT_FOUND);
 }
+
+#[tokio::test(flavor = "multi_thread")]
+async fn delete_missing_translation_test() {
+	let env = TestEnv::new().await.login_admin().await;
+
+	let delete_response = env.app.delete("/translations/999999").await;
+
+	assert_eq!(delete_response.status_code(), StatusCode::NOT_FOUND);
+}